@@ -0,0 +1,43 @@
+# codec.py
+# Compact encodings of pancake stacks (permutations of 0..n-1) for the search tables.
+
+RANK_MAX_PANCAKES = 20  # 20! < 2**63, so the rank of a stack this size still fits in a machine word
+
+def rank(stack, n=None):
+    '''Compute the lexicographic rank (Lehmer code read as a factorial-base number) of a permutation of 0..n-1.
+    Given n, the stack may also be the first k items of a permutation of 0..n-1, ranked among the n!/(n-k)! of them.'''
+    n = len(stack) if n is None else n
+    r = 0
+    used = 0 # bitmask of the pancakes we have already seen
+    for i, p in enumerate(stack):
+        # the Lehmer digit is the number of smaller pancakes that have not been seen yet
+        digit = p - (used & ((1 << p) - 1)).bit_count()
+        r = r * (n - i) + digit
+        used |= 1 << p
+    return r
+
+def unrank(r, n, k=None):
+    '''Rebuild the permutation of 0..n-1 with a given lexicographic rank, as a tuple.
+    Given k, rebuild the first k items of a permutation instead (the inverse of rank(stack, n) for len(stack) == k).'''
+    k = n if k is None else k
+
+    # peel the factorial-base digits off of the rank, least significant (last position) first
+    digits = []
+    for i in reversed(range(k)):
+        r, digit = divmod(r, n - i)
+        digits.append(digit)
+
+    remaining = list(range(n))
+    return tuple(remaining.pop(digit) for digit in reversed(digits))
+
+def encode(stack):
+    '''Encode a stack of pancakes as a single int (n <= 20) or as packed bytes (larger stacks).'''
+    if len(stack) <= RANK_MAX_PANCAKES:
+        return rank(stack)
+    return bytes(stack)
+
+def decode(code, n):
+    '''Decode a stack of n pancakes encoded by encode() back into a tuple.'''
+    if n <= RANK_MAX_PANCAKES:
+        return unrank(code, n)
+    return tuple(code)
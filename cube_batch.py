@@ -0,0 +1,92 @@
+# cube_batch.py
+# Optional NumPy engine for the Rubik's cube: a whole layer of the search is stored as one uint8 array with a row
+# per cube, and every move is applied to every cube at once with fancy indexing, so the per-node work runs in C.
+
+import numpy as np
+from cube_moves import METRICS, MOVES
+
+BEAM_WIDTH = 2 ** 14  # cubes kept in each layer of a beam search, unless params['beam_width'] is given
+
+# (moves, 54) arrays with one sticker permutation per move of each turn metric
+MOVE_TABLES = {metric: np.array([MOVES[move] for move in moves], dtype=np.intp) for metric, moves in METRICS.items()}
+CENTERS = np.arange(4, 54, 9) # the center sticker of each face (4, 13, ..., 49), which never moves
+GOAL = np.repeat(np.arange(6, dtype=np.uint8), 9) # the solved cube
+
+# Rows are hashed to 64-bit keys as a weighted sum of their stickers (wrapping around), with random odd weights.
+# Two different cubes share a key with a chance of about 2^-64, in which case one of them would be skipped
+_WEIGHTS = np.random.default_rng(54).integers(0, 2 ** 63, size=54, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+def expand(cubes, metric='qtm'):
+    '''Apply every move of a turn metric to every cube of a (K, 54) array, returning the (12K, 54) children (18K in the
+    half-turn metric). Child i is cube i // m turned by move METRICS[metric][i % m], for the m moves of the metric.'''
+    return cubes[:, MOVE_TABLES[metric]].reshape(-1, 54)
+
+def heuristic(cubes):
+    '''Compute h(state) for every cube of a (K, 54) array: the average number of stickers on each face that
+    do not match the face center (the same heuristic as rubiks_core.heuristic).'''
+    return np.count_nonzero(cubes != np.repeat(cubes[:, CENTERS], 9, axis=1), axis=1) / 6
+
+def row_keys(cubes):
+    '''Hash every cube of a (K, 54) array to a 64-bit key.'''
+    return (cubes.astype(np.uint64) * _WEIGHTS).sum(axis=1, dtype=np.uint64)
+
+def contains(keys, queries):
+    '''Check which of the queries are in a sorted array of keys.'''
+    where = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+    return keys[where] == queries
+
+def search(state, params, width=None, verbose=False, stats=None):
+    '''Run breadth-first search on the cube one whole layer at a time, and return a shortest solution path and the
+    number of nodes expanded. Given a width, run beam search instead: only the width cubes with the lowest heuristic
+    are kept in each layer, which reaches much deeper scrambles but no longer guarantees the shortest path.
+    If a stats dict is given, the number of nodes generated and the peak size of a layer are stored in it.'''
+    if params['n'] != 3:
+        raise ValueError("the NumPy engine only handles the 3x3 cube")
+    metric = params.get('metric', 'qtm')
+    moves = METRICS[metric]
+
+    layer = np.asarray(state, dtype=np.uint8).reshape(1, 54)
+    seen = row_keys(layer) # sorted keys of every cube kept so far, so no cube is searched twice
+    history = [] # (parent index, move index) of every cube in each layer after the first, doubling as the backpointers
+    cnt = 0
+    generated = 0
+    frontier_peak = 1
+    solved = np.flatnonzero((layer == GOAL).all(axis=1))
+
+    while not len(solved):
+        if not len(layer):
+            raise ValueError("no solution found (the beam search ran out of new cubes)")
+        if verbose:
+            print(f'  depth {len(history) + 1}: expanding {len(layer)} cubes')
+        cnt += len(layer)
+
+        children = expand(layer, metric)
+        generated += len(children)
+
+        # drop repeated cubes within the layer, and cubes that were already reached in an earlier layer
+        keys, first = np.unique(row_keys(children), return_index=True)
+        new = ~contains(seen, keys)
+        keys, first = keys[new], first[new]
+
+        # in a beam search, only keep the most promising cubes
+        if width is not None and len(first) > width:
+            best = np.argpartition(heuristic(children[first]), width)[:width]
+            keys, first = keys[best], first[best]
+
+        history.append(np.divmod(first, len(moves)))
+        layer = children[first]
+        seen = np.union1d(seen, keys)
+        frontier_peak = max(frontier_peak, len(layer))
+        solved = np.flatnonzero((layer == GOAL).all(axis=1))
+
+    # walk back through the layers from the solved cube, and reverse
+    path = []
+    i = solved[0]
+    for parents, move_indices in reversed(history):
+        path.append(moves[move_indices[i]])
+        i = parents[i]
+
+    if stats is not None:
+        stats['generated'] = generated
+        stats['frontier_peak'] = frontier_peak
+    return "".join(reversed(path)), cnt
@@ -0,0 +1,80 @@
+# cube_cache.py
+# Persistent cache of cube solutions in an SQLite file, keyed by a compact encoding of the cube state, so that a state
+# that was already solved (by the same solving mode with the same settings, in the same turn metric) is answered without
+# searching again.
+# States are stored by the representative of their symmetry class (see cube_symmetry.py), so a solution also answers
+# the up to 47 other states that are the same cube turned, mirrored or recolored.
+
+import sqlite3
+import time
+from cube_cubie import from_stickers, pack
+from cube_symmetry import INVERSE, canonical, transform_path
+
+MAX_ENTRIES = 100000  # solutions kept in the cache; the least recently used ones are evicted beyond this
+VERSION = 1  # stored as the user_version of the file; caches from before symmetry reduction are emptied
+
+def state_key(state):
+    '''Encode a cube state compactly: the cubie coordinates packed into 9 bytes (see cube_cubie.pack),
+    or the 54 stickers as bytes for a coloring that is not a valid cube.'''
+    try:
+        return pack(from_stickers(state)).to_bytes(9, 'big')
+    except ValueError:
+        return bytes(state)
+
+def canonical_key(state):
+    '''Encode the representative of a state's symmetry class, and return it with the symmetry that turns the state
+    into it (see cube_symmetry.canonical). A coloring whose centers are not all different is encoded as is.'''
+    try:
+        representative, k = canonical(state)
+    except ValueError:
+        return bytes(state), 0
+    return state_key(representative), k
+
+class SolutionCache:
+    '''Solutions stored in an SQLite file, with least recently used eviction once there are more than max_entries.'''
+
+    def __init__(self, file_name, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(file_name)
+        # write-ahead logging without syncing on every commit keeps lookups (which update the time used) fast
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != VERSION:
+            # the solutions of an older cache are not in the frame of the representatives
+            self.db.execute('DROP TABLE IF EXISTS solutions')
+            self.db.execute(f'PRAGMA user_version = {VERSION}')
+        self.db.execute('''CREATE TABLE IF NOT EXISTS solutions (
+                               state BLOB, method TEXT, metric TEXT, path TEXT, used REAL,
+                               PRIMARY KEY (state, method, metric))''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+        self.db.commit()
+
+    def get(self, state, method, metric='qtm'):
+        '''Look up the solution of a state, returning None if it is not in the cache. The method names the solving mode
+        and its settings (see rubiks_core.cache_tag).'''
+        key, k = canonical_key(state)
+        row = self.db.execute('SELECT path FROM solutions WHERE state = ? AND method = ? AND metric = ?',
+                              (key, method, metric)).fetchone()
+        if row is None:
+            return None
+        with self.db:
+            self.db.execute('UPDATE solutions SET used = ? WHERE state = ? AND method = ? AND metric = ?',
+                            (time.time(), key, method, metric))
+        # the stored path solves the representative, so turn it back to the state's own frame
+        return transform_path(row[0], INVERSE[k])
+
+    def put(self, state, method, metric, path):
+        '''Store the solution of a state, evicting the least recently used solutions if the cache is full.'''
+        key, k = canonical_key(state)
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)',
+                            (key, method, metric, transform_path(path, k), time.time()))
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self.db.execute('DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY used LIMIT ?)', (excess,))
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,133 @@
+# cube_cubie.py
+# Cubie-level model of the 3x3 Rubik's cube: which corner and edge cubie sits at each position, and how it is twisted
+# or flipped there. A move is a small table of 8 + 12 positions instead of a shuffle of 54 stickers, a cube packs into
+# one int of about 8 bytes, and the coordinates used by coordinate-based heuristics and tables are cheap to compute.
+
+from codec import rank, unrank
+from cube_moves import MOVES, apply
+
+# Stickers of each cubie position, in the order URF UFL ULB UBR DFR DLF DBL DRB for the corners and
+# UR UF UL UB DR DF DL DB FR FL BL BR for the edges. Corner stickers start with the U/D sticker and go
+# clockwise; edge stickers start with the U/D sticker (or the F/B sticker for the middle layer).
+CORNER_FACELETS = ((8, 27, 20), (6, 18, 11), (0, 9, 38), (2, 36, 29),
+                   (47, 26, 33), (45, 17, 24), (51, 44, 15), (53, 35, 42))
+EDGE_FACELETS = ((5, 28), (7, 19), (3, 10), (1, 37), (50, 34), (46, 25),
+                 (48, 16), (52, 43), (23, 30), (21, 14), (41, 12), (39, 32))
+
+# A cube is a tuple (cp, co, ep, eo): the corner cubie at each corner position and its twist (0-2, how far its
+# U/D sticker is turned clockwise from the position's first sticker), and the edge cubie at each edge position
+# and its flip (0 or 1)
+SOLVED = (tuple(range(8)), (0,) * 8, tuple(range(12)), (0,) * 12)
+
+def _colors(facelets):
+    '''Map the set of colors of each cubie to the cubie and the color of its first sticker (in the solved cube, sticker f has color f // 9).'''
+    return {frozenset(f // 9 for f in stickers): (cubie, stickers[0] // 9) for cubie, stickers in enumerate(facelets)}
+
+CUBIE_COLORS = {facelets: _colors(facelets) for facelets in (CORNER_FACELETS, EDGE_FACELETS)}
+
+def from_stickers(state):
+    '''Convert a 54-sticker cube state (as read from a state file, or used by recolor) to a cubie cube.
+    Raises ValueError if the stickers of a position do not belong to one cubie.'''
+    cube = []
+    for facelets in (CORNER_FACELETS, EDGE_FACELETS):
+        cubies, orientations = [], []
+        for stickers in facelets:
+            colors = [state[f] for f in stickers]
+            try:
+                cubie, first_color = CUBIE_COLORS[facelets][frozenset(colors)]
+            except KeyError:
+                raise ValueError(f"no cubie has the colors {colors}") from None
+            cubies.append(cubie)
+            orientations.append(colors.index(first_color))
+        cube += [tuple(cubies), tuple(orientations)]
+    return tuple(cube)
+
+def to_stickers(cube):
+    '''Convert a cubie cube back to a list of 54 sticker colors (the centers never move).'''
+    state = [f // 9 for f in range(54)]
+    for facelets, cubies, orientations in ((CORNER_FACELETS, cube[0], cube[1]), (EDGE_FACELETS, cube[2], cube[3])):
+        n = len(facelets[0])
+        for stickers, cubie, o in zip(facelets, cubies, orientations):
+            # the cubie's first sticker is o stickers along from the position's first sticker
+            for k in range(n):
+                state[stickers[(k + o) % n]] = facelets[cubie][k] // 9
+    return state
+
+def multiply(a, b):
+    '''Apply the cubie permutation of cube b to cube a (for a move b, this turns cube a).'''
+    cp = tuple(a[0][p] for p in b[0])
+    co = tuple((a[1][p] + o) % 3 for p, o in zip(b[0], b[1]))
+    ep = tuple(a[2][p] for p in b[2])
+    eo = tuple((a[3][p] + o) % 2 for p, o in zip(b[2], b[3]))
+    return cp, co, ep, eo
+
+# every move of the sticker engine (see cube_moves.py) as a cubie cube, found by turning the solved cube
+CUBIE_MOVES = {move: from_stickers(apply(to_stickers(SOLVED), perm)) for move, perm in MOVES.items()}
+
+def apply_move(cube, move):
+    '''Turn a cubie cube by a move (e.g. "u", "R" or "F2"), returning the new cube.'''
+    return multiply(cube, CUBIE_MOVES[move])
+
+def is_valid(cube):
+    '''Check whether a cubie cube can be reached by turning faces: the twists add up to a multiple of 3,
+    the flips to a multiple of 2, and the corner and edge permutations have the same parity.'''
+    return (sum(cube[1]) % 3 == 0 and sum(cube[3]) % 2 == 0
+            and parity(cube[0]) == parity(cube[2]))
+
+def parity(perm):
+    '''Parity of a permutation (0 for even, 1 for odd).'''
+    return sum(perm[j] < perm[i] for i in range(len(perm)) for j in range(i + 1, len(perm))) % 2
+
+# Coordinates: each part of a cube numbered from 0. The last twist and flip follow from the others, so they are left out
+def twist(cube):
+    '''Corner orientation coordinate, 0 <= twist < 3^7.'''
+    t = 0
+    for o in cube[1][:7]:
+        t = t * 3 + o
+    return t
+
+def flip(cube):
+    '''Edge orientation coordinate, 0 <= flip < 2^11.'''
+    f = 0
+    for o in cube[3][:11]:
+        f = f * 2 + o
+    return f
+
+def corner_permutation(cube):
+    '''Corner permutation coordinate, 0 <= rank < 8!.'''
+    return rank(cube[0])
+
+def edge_permutation(cube):
+    '''Edge permutation coordinate, 0 <= rank < 12!.'''
+    return rank(cube[2])
+
+def pack(cube):
+    '''Pack a cubie cube into one int below 2^66 (about 8 bytes), from its four coordinates. The edge permutation has the
+    same parity as the corner permutation, and the permutations with ranks 2k and 2k + 1 only differ by swapping the
+    last two edges, so only half of the edge permutation rank is stored.'''
+    return ((corner_permutation(cube) * 2187 + twist(cube)) * 239500800 + edge_permutation(cube) // 2) * 2048 + flip(cube)
+
+def unpack(code):
+    '''Rebuild a cubie cube from the int made by pack().'''
+    code, f = divmod(code, 2048)
+    code, ep = divmod(code, 239500800)
+    cp, t = divmod(code, 2187)
+    cp = unrank(cp, 8)
+    ep = list(unrank(2 * ep, 12))
+    if parity(ep) != parity(cp):
+        ep[10], ep[11] = ep[11], ep[10]
+
+    co = []
+    for _ in range(7):
+        t, o = divmod(t, 3)
+        co.append(o)
+    co.reverse()
+    co.append(-sum(co) % 3)
+
+    eo = []
+    for _ in range(11):
+        f, o = divmod(f, 2)
+        eo.append(o)
+    eo.reverse()
+    eo.append(sum(eo) % 2)
+    return cp, tuple(co), tuple(ep), tuple(eo)
@@ -0,0 +1,173 @@
+# cube_hda.py
+# Hash-distributed A* (HDA*) for the Rubik's cube: every cube state is owned by one worker process, picked by a hash
+# of the state, and each worker runs A* on the states it owns with its own open and closed lists. Children owned by
+# another worker are sent to it in batches, so all cores search one scramble together. Workers never wait for each
+# other: each one expands its own open list, only pruning nodes that cannot beat the best solution found so far.
+
+import math
+import multiprocessing
+import os
+import queue
+import zlib
+from frontier import Frontier
+from cube_moves import MOVES, apply, successors
+from rubiks_core import heuristic, solved_state
+
+BATCH = 256  # children buffered for another worker before they are sent as one message
+EXPANSIONS = 64  # nodes expanded between checks of the inbox (the buffered children are sent after each round, too)
+
+def owner(state, workers):
+    '''Pick the worker that owns a cube state (given as bytes). crc32 is the same in every process,
+    unlike hash() of bytes, which is salted per process.'''
+    return zlib.crc32(state) % workers
+
+def hda(state, params, verbose=False, stats=None, pdb=None):
+    '''Run hash-distributed A* on the cube across params['workers'] worker processes (default: one per core), and
+    return the solution path and the number of nodes expanded. The search only stops when no worker has a node left
+    whose cost is below the best solution found, and no children are still on their way between workers, so the path
+    is as short as the one A* would find with the same (admissible) heuristic. If a stats dict is given, the number of
+    nodes generated and the nodes expanded by each worker are stored in it.'''
+    workers = params.get('workers') or os.cpu_count()
+    start = bytes(state)
+
+    # work counts the messages sent but not yet taken in, plus the workers that are busy, so the search is over
+    # exactly when it drops to 0 (a worker only gets busy by taking a message, and counts itself busy before
+    # taking the message's count off)
+    work = multiprocessing.Value('i', 1)
+    incumbent = multiprocessing.Value('d', math.inf) # cost of the best solution found so far
+    done = multiprocessing.Event()
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+
+    inboxes[owner(start, workers)].put([(start, 0, ())])
+    processes = [multiprocessing.Process(target=worker, args=(i, inboxes, results, work, incumbent, done, params, pdb))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    # wait for the search to end, in case a worker dies instead
+    while not done.wait(0.5):
+        if any(process.exitcode not in (None, 0) for process in processes):
+            for process in processes:
+                process.terminate()
+            raise RuntimeError("a worker process of the parallel search failed")
+
+    best, path = math.inf, None
+    cnt = 0
+    generated = 0
+    expanded = [0] * workers
+    for _ in range(workers):
+        for kind, index, *values in iter(results.get, None):
+            if kind == 'solution' and values[0] < best:
+                best, path = values
+            elif kind == 'stats':
+                expanded[index], worker_generated = values
+                cnt += expanded[index]
+                generated += worker_generated
+    for process in processes:
+        process.join()
+
+    if verbose:
+        print(f'  nodes expanded by each worker: {expanded}')
+    if stats is not None:
+        stats['generated'] = generated
+        stats['expanded_per_worker'] = expanded
+    return "".join(path), cnt
+
+def worker(index, inboxes, results, work, incumbent, done, params, pdb):
+    '''Worker process of the parallel search: run A* on the states this worker owns, until the search is over.'''
+    h = heuristic if pdb is None else pdb.heuristic
+    metric = params.get('metric', 'qtm')
+    goal = bytes(solved_state(params['n']))
+    workers = len(inboxes)
+    inbox = inboxes[index]
+
+    open_list = Frontier()
+    closed = dict() # {state : fewest moves g(state) found so far}
+    outboxes = [[] for _ in range(workers)] # children waiting to be sent to each worker
+    busy = False
+    cnt = 0
+    generated = 0
+
+    def take(nodes):
+        '''Add the nodes of a message to the open list, unless their state was already reached with fewer moves.'''
+        for child_state, g, path in nodes:
+            if child_state not in closed or g < closed[child_state]:
+                closed[child_state] = g
+                open_list.push((child_state, path), (g + h(child_state), -g))
+
+    def solution(g, path):
+        '''Record a solution, if it is better than the best one found so far.'''
+        with incumbent.get_lock():
+            if g < incumbent.value:
+                incumbent.value = g
+                results.put(('solution', index, g, path))
+
+    def send(destination):
+        '''Send the buffered children to another worker, counting the message before it can be taken in.'''
+        with work.get_lock():
+            work.value += 1
+        inboxes[destination].put(outboxes[destination])
+        outboxes[destination] = []
+
+    while not done.is_set():
+        # take in the messages that have arrived, waiting a moment for one while there is nothing to do
+        timeout = 0.05 if not busy else None
+        try:
+            while True:
+                nodes = inbox.get_nowait() if timeout is None else inbox.get(timeout=timeout)
+                timeout = None
+                if busy:
+                    with work.get_lock():
+                        work.value -= 1
+                busy = True # when idle, the message's count becomes this worker's busy count
+                take(nodes)
+        except queue.Empty:
+            if not busy:
+                continue
+
+        for _ in range(EXPANSIONS):
+            # nodes that cannot lead to a better solution than the best one found are never expanded
+            if not open_list or open_list.peek()[1][0] >= incumbent.value:
+                break
+            (curr_state, path), (f, neg_g) = open_list.pop()
+            g = -neg_g
+            if g > closed[curr_state]:
+                continue # stale entry, reached with fewer moves since
+            cnt += 1
+
+            if curr_state == goal:
+                solution(g, path) # only when the scramble is already solved
+                continue
+
+            for move in successors(path[-1] if path else None, path[-2] if len(path) > 1 else None, metric):
+                child_state = bytes(apply(curr_state, MOVES[move]))
+                generated += 1
+
+                # solutions are recorded as soon as they are generated, so that the other workers
+                # stop expanding nodes that cannot beat them as early as possible
+                if child_state == goal:
+                    solution(g + 1, path + (move,))
+                    continue
+                destination = owner(child_state, workers)
+                if destination == index:
+                    take([(child_state, g + 1, path + (move,))])
+                else:
+                    outboxes[destination].append((child_state, g + 1, path + (move,)))
+                    if len(outboxes[destination]) >= BATCH:
+                        send(destination)
+
+        for destination in range(workers):
+            if outboxes[destination]:
+                send(destination)
+
+        # out of useful work: go idle
+        if not open_list or open_list.peek()[1][0] >= incumbent.value:
+            busy = False
+            with work.get_lock():
+                work.value -= 1
+                if work.value == 0:
+                    done.set()
+
+    results.put(('stats', index, cnt, generated))
+    results.put(None)
@@ -0,0 +1,105 @@
+# cube_moves.py
+# Move engine for the 3x3 Rubik's cube: every quarter and half turn is precomputed as a permutation of the 54 stickers,
+# so applying a move (or a whole sequence of moves) is a single gather into a new tuple.
+
+import re
+
+# For each face, the stickers that a quarter turn moves (src), and where they end up turning the face
+# clockwise (CW) and counterclockwise (CCW). Stickers are numbered face by face (U, L, F, R, B, D), 9 per face.
+STICKERS = {
+    'U': ([9, 10, 11, 18, 19, 20, 27, 28, 29, 36, 37, 38, 0, 1, 2, 5, 8, 7, 6, 3],
+          [36, 37, 38, 9, 10, 11, 18, 19, 20, 27, 28, 29, 2, 5, 8, 7, 6, 3, 0, 1],
+          [18, 19, 20, 27, 28, 29, 36, 37, 38, 9, 10, 11, 6, 3, 0, 1, 2, 5, 8, 7]),
+    'D': ([45, 46, 47, 50, 53, 52, 51, 48, 15, 16, 17, 24, 25, 26, 33, 34, 35, 42, 43, 44],
+          [47, 50, 53, 52, 51, 48, 45, 46, 24, 25, 26, 33, 34, 35, 42, 43, 44, 15, 16, 17],
+          [51, 48, 45, 46, 47, 50, 53, 52, 42, 43, 44, 15, 16, 17, 24, 25, 26, 33, 34, 35]),
+    'L': ([0, 3, 6, 18, 21, 24, 45, 48, 51, 38, 41, 44, 9, 10, 11, 12, 14, 15, 16, 17],
+          [18, 21, 24, 45, 48, 51, 44, 41, 38, 6, 3, 0, 11, 14, 17, 10, 16, 9, 12, 15],
+          [44, 41, 38, 0, 3, 6, 18, 21, 24, 51, 48, 45, 15, 12, 9, 16, 10, 17, 14, 11]),
+    'R': ([2, 5, 8, 20, 23, 26, 47, 50, 53, 36, 39, 42, 27, 28, 29, 30, 32, 33, 34, 35],
+          [42, 39, 36, 2, 5, 8, 20, 23, 26, 53, 50, 47, 29, 32, 35, 28, 34, 27, 30, 33],
+          [20, 23, 26, 47, 50, 53, 42, 39, 36, 8, 5, 2, 33, 30, 27, 34, 28, 35, 32, 29]),
+    'B': ([36, 37, 38, 41, 44, 43, 42, 39, 2, 1, 0, 9, 12, 15, 51, 52, 53, 35, 32, 29],
+          [38, 41, 44, 43, 42, 39, 36, 37, 9, 12, 15, 51, 52, 53, 35, 32, 29, 2, 1, 0],
+          [42, 39, 36, 37, 38, 41, 44, 43, 35, 32, 29, 2, 1, 0, 9, 12, 15, 51, 52, 53]),
+    'F': ([18, 19, 20, 23, 26, 25, 24, 21, 6, 7, 8, 27, 30, 33, 47, 46, 45, 17, 14, 11],
+          [20, 23, 26, 25, 24, 21, 18, 19, 27, 30, 33, 47, 46, 45, 17, 14, 11, 6, 7, 8],
+          [24, 21, 18, 19, 20, 23, 26, 25, 17, 14, 11, 6, 7, 8, 27, 30, 33, 47, 46, 45]),
+}
+
+IDENTITY = tuple(range(54))
+
+def make_move(src, dst):
+    '''Build the permutation that sends sticker src[i] to position dst[i], leaving all other stickers in place.
+    A permutation p is applied to a state by new_state[j] = state[p[j]].'''
+    perm = list(IDENTITY)
+    for i, j in zip(src, dst):
+        perm[j] = i
+    return tuple(perm)
+
+def apply(state, perm):
+    '''Apply a permutation to a cube state, returning the new state as a tuple.'''
+    return tuple([state[i] for i in perm])
+
+def compose(*perms):
+    '''Compose permutations into one that has the same effect as applying them in order.'''
+    result = IDENTITY
+    for perm in perms:
+        result = tuple([result[i] for i in perm])
+    return result
+
+def parse(path):
+    '''Split a path (e.g. "uR2f") into its moves (["u", "R2", "f"]). A list of moves is returned as it is.'''
+    if isinstance(path, str):
+        return re.findall('[UDLRBF]2|[udlrbfUDLRBF]', path)
+    return path
+
+def macro(path):
+    '''Compose a sequence of moves (e.g. "uR2f") into a single permutation.'''
+    return compose(*[MOVES[move] for move in parse(path)])
+
+# moves in the notation used for paths: lowercase turns a face CW, uppercase turns it CCW, and a face followed by 2 is a half turn
+MOVES = dict()
+INVERSE = dict() # the move that undoes each move
+for face, (src, cw, ccw) in STICKERS.items():
+    MOVES[face.lower()] = make_move(src, cw)
+    MOVES[face] = make_move(src, ccw)
+    MOVES[face + '2'] = compose(MOVES[face], MOVES[face])
+    INVERSE[face.lower()], INVERSE[face], INVERSE[face + '2'] = face, face.lower(), face + '2'
+
+# The moves that cost one step in each turn metric: the quarter-turn metric (qtm) counts a half turn as two moves,
+# while the half-turn metric (htm) counts it as one, so solutions are shallower
+METRICS = {'qtm': "u d l r b f U D L R B F".split(),
+           'htm': "u d l r b f U D L R B F U2 D2 L2 R2 B2 F2".split()}
+
+# Canonical move sequences: opposite faces commute (e.g. "ud" and "du" reach the same state), so after turning
+# D, R or B we never turn U, L or F respectively, and only the other order of the pair is searched
+COMMUTES_BEFORE = {'D': 'U', 'R': 'L', 'B': 'F'}
+
+def is_canonical(move, last=None, before_last=None, metric='qtm'):
+    '''Check whether a move may follow the last two moves of a path without repeating a shorter or equivalent
+    sequence: undoing the last move, a third turn of a face in the same direction (two turns the other way
+    are shorter), turning the same face twice in a row in the half-turn metric (where any two turns of a face
+    make at most one move), or turning a face after its opposite face in the non-canonical order.'''
+    if last is None:
+        return True
+    face, last_face = move[0].upper(), last[0].upper()
+    if face == last_face:
+        if metric == 'htm':
+            return False  # the two turns are one half turn, quarter turn or nothing
+        if move != last:
+            return False  # undoes the last move
+        if before_last == move:
+            return False  # three quarter turns are one quarter turn the other way
+    return COMMUTES_BEFORE.get(last_face) != face
+
+# the moves that may follow each pair of (before last, last) moves in each metric, in the order the search tries them
+SUCCESSORS = dict()
+for metric, moves in METRICS.items():
+    for before_last in [None] + moves:
+        for last in [None] + moves:
+            SUCCESSORS[metric, before_last, last] = tuple(move for move in moves if is_canonical(move, last, before_last, metric))
+
+def successors(last=None, before_last=None, metric='qtm'):
+    '''Look up the canonical moves that may follow the last two moves of a path.'''
+    return SUCCESSORS[metric, before_last, last]
@@ -0,0 +1,221 @@
+# cube_pdb.py
+# Pattern databases for the Rubik's cube: the number of moves needed to solve a group of corner or edge cubies,
+# precomputed by breadth-first search backward from the solved cube, stored with 4 bits per entry and memory-mapped.
+
+import argparse
+import array
+import mmap
+import os
+import time
+from codec import rank, unrank
+from cube_cubie import CORNER_FACELETS, CUBIE_COLORS, EDGE_FACELETS
+from cube_moves import METRICS, MOVES
+
+parser = argparse.ArgumentParser(description="Build corner and edge pattern databases for the Rubik's cube")
+parser.add_argument('-o', '--output', help="directory to write the pattern databases to", default='cube_pdb')
+parser.add_argument('-g', '--groups', nargs='+', default=['c:0,1,2,3,4,5,6,7', 'e:0,1,2,3,4,5', 'e:6,7,8,9,10,11'],
+                    help="cubies in each pattern database, as c:<corners> or e:<edges> (default: all corners, and the edges split in two)")
+parser.add_argument('--metric', choices=list(METRICS), default='qtm', help="turn metric to count moves in (quarter turns, or half turns as one move)")
+
+KINDS = {'c': CORNER_FACELETS, 'e': EDGE_FACELETS}
+
+MAGIC = b'CUBE-PDB\x02'
+UNSEEN = 0xF  # distance marker for entries the BFS has not reached yet
+
+# pattern databases that have already been loaded by this process, so each file is mapped only once
+_loaded = dict() # {file name : PatternDatabase}
+
+def main(args):
+    os.makedirs(args.output, exist_ok=True)
+    for group in args.groups:
+        kind, cubies = group.split(':')
+        cubies = [int(c) for c in cubies.split(',')]
+
+        start = time.perf_counter()
+        table = build(kind, cubies, args.metric)
+        file_name = os.path.join(args.output, f"{'corners' if kind == 'c' else 'edges'}-{'-'.join(map(str, cubies))}.pdb")
+        write(file_name, kind, cubies, table, args.metric)
+        print(f'wrote {file_name} ({time.perf_counter() - start:.1f} s)')
+
+def cubie_moves(facelets, metric='qtm'):
+    '''For each move of a turn metric, find where the cubie at each position goes and how much its orientation changes.
+    Returns {move : (destination of each position, orientation change of each position)}.'''
+    where = {f: (p, k) for p, stickers in enumerate(facelets) for k, f in enumerate(stickers)}
+    tables = dict()
+    for move in METRICS[metric]:
+        perm = MOVES[move]
+        forward = [0] * 54 # where each sticker goes
+        for j, i in enumerate(perm):
+            forward[i] = j
+
+        destination, twist = [], []
+        for stickers in facelets:
+            q, k = where[forward[stickers[0]]]
+            destination.append(q)
+            twist.append(k)
+        tables[move] = (tuple(destination), tuple(twist))
+    return tables
+
+def read_cubies(state, facelets):
+    '''Find the position and orientation of every corner (or edge) cubie in a sticker state.
+    Returns a list with a (position, orientation) pair for each cubie.'''
+    found = [None] * len(facelets)
+    for p, stickers in enumerate(facelets):
+        colors = [state[f] for f in stickers]
+        # the cubie is the one whose home stickers have these colors, and its orientation is
+        # where the color of its first home sticker ended up
+        cubie, first_color = CUBIE_COLORS[facelets][frozenset(colors)]
+        found[cubie] = (p, colors.index(first_color))
+    return found
+
+class Pattern:
+    '''Indexing of a group of corner or edge cubies: the positions of the cubies (a partial permutation) and
+    their orientations. When every cubie of a kind is in the group, the last orientation follows from the others.'''
+
+    def __init__(self, kind, cubies):
+        self.kind = kind
+        self.facelets = KINDS[kind]
+        self.cubies = tuple(cubies)
+        self.positions = len(self.facelets)
+        self.orientations = len(self.facelets[0])
+        self.free = len(self.cubies) - (len(self.cubies) == self.positions) # orientations stored in the index
+
+        self.placements = 1
+        for i in range(len(self.cubies)):
+            self.placements *= self.positions - i
+        self.size = self.placements * self.orientations ** self.free
+
+    def index(self, positions, orientations):
+        '''Index of the cubies of the group at the given positions and orientations.'''
+        twist = 0
+        for o in orientations[:self.free]:
+            twist = twist * self.orientations + o
+        return rank(positions, self.positions) * self.orientations ** self.free + twist
+
+    def unindex(self, index):
+        '''Positions and orientations of the cubies of the group for an index.'''
+        placement, twist = divmod(index, self.orientations ** self.free)
+        orientations = []
+        for _ in range(self.free):
+            twist, o = divmod(twist, self.orientations)
+            orientations.append(o)
+        orientations.reverse()
+        if self.free < len(self.cubies):
+            orientations.append(-sum(orientations) % self.orientations)
+        return unrank(placement, self.positions, len(self.cubies)), orientations
+
+    def state_index(self, state):
+        '''Index of the group in a sticker state of the cube.'''
+        found = read_cubies(state, self.facelets)
+        return self.index([found[c][0] for c in self.cubies], [found[c][1] for c in self.cubies])
+
+def build(kind, cubies, metric='qtm'):
+    '''Compute the number of moves (in a turn metric) needed to solve a group of corner or edge cubies from every
+    placement of them, by breadth-first search backward from the solved cube (every move has an inverse move).
+    Returns a bytearray holding a 4-bit distance per index of the group.'''
+    pattern = Pattern(kind, cubies)
+    assert pattern.size < 2 ** 32, "pattern database too large"
+    moves = list(cubie_moves(pattern.facelets, metric).values())
+    table = bytearray([0xFF]) * ((pattern.size + 1) // 2)
+
+    goal = pattern.index(pattern.cubies, [0] * len(pattern.cubies))
+    set_entry(table, goal, 0)
+    layer = array.array('I', [goal])
+    distance = 0
+    while layer:
+        distance += 1
+        next_layer = array.array('I')
+        for index in layer:
+            positions, orientations = pattern.unindex(index)
+            for destination, twist in moves:
+                child = pattern.index([destination[p] for p in positions],
+                                      [(o + twist[p]) % pattern.orientations for p, o in zip(positions, orientations)])
+                if get_entry(table, child) == UNSEEN:
+                    set_entry(table, child, distance)
+                    next_layer.append(child)
+        print(f'  distance {distance}: {len(next_layer)} entries')
+        layer = next_layer
+
+    return table
+
+def get_entry(table, index):
+    '''Read a 4-bit entry (two entries are packed in each byte).'''
+    return (table[index >> 1] >> ((index & 1) << 2)) & 0xF
+
+def set_entry(table, index, value):
+    '''Write a 4-bit entry (two entries are packed in each byte).'''
+    shift = (index & 1) << 2
+    table[index >> 1] = (table[index >> 1] & ~(0xF << shift) & 0xFF) | (value << shift)
+
+def write(file_name, kind, cubies, table, metric='qtm'):
+    '''Write a pattern database to a file: a header with the turn metric, the kind of cubies and the group, followed by the packed table.'''
+    with open(file_name, 'wb') as file:
+        file.write(MAGIC)
+        file.write(metric.encode() + kind.encode() + bytes([len(cubies)] + list(cubies)))
+        file.write(table)
+
+def load(path, symmetric=False):
+    '''Load pattern databases from a file, a directory of .pdb files, or a list of either, by memory-mapping them
+    so that every process using the same files shares one copy in the page cache. If symmetric is set, each database
+    is also looked up in the cube turned about its URF corner (see PatternHeuristic).'''
+    if isinstance(path, (list, tuple)):
+        files = []
+        for p in path:
+            files += load(p).databases
+    elif os.path.isdir(path):
+        files = [load(os.path.join(path, f)).databases[0] for f in sorted(os.listdir(path)) if f.endswith('.pdb')]
+    else:
+        if path not in _loaded:
+            _loaded[path] = PatternDatabase(path)
+        files = [_loaded[path]]
+    return PatternHeuristic(files, symmetric)
+
+class PatternDatabase:
+    '''A memory-mapped pattern database for one group of corner or edge cubies.'''
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        with open(file_name, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{file_name} is not a cube pattern database")
+        self.metric = self.data[len(MAGIC):len(MAGIC) + 3].decode()
+        offset = len(MAGIC) + 3
+        kind, k = chr(self.data[offset]), self.data[offset + 1]
+        self.pattern = Pattern(kind, self.data[offset + 2:offset + 2 + k])
+        self.offset = offset + 2 + k
+
+    def lookup(self, state):
+        '''Look up the number of moves needed to solve the group in a sticker state.'''
+        index = self.pattern.state_index(state)
+        return (self.data[self.offset + (index >> 1)] >> ((index & 1) << 2)) & 0xF
+
+class PatternHeuristic:
+    '''Admissible heuristic for the cube: the largest distance over a set of pattern databases.
+    A symmetric cube (see cube_symmetry.py) is exactly as far from solved, so with symmetric set the databases are also
+    looked up in the cube turned to put R, then F on top: the corners and edges of the other layers get their own lookup
+    from the same tables, which makes the heuristic stronger without building more databases.'''
+
+    def __init__(self, databases, symmetric=False):
+        self.databases = databases
+        self.symmetric = symmetric
+        if symmetric:
+            from cube_symmetry import DIAGONAL, transform
+            self.turns = DIAGONAL[1:]
+            self.transform = transform
+
+    def __reduce__(self):
+        # memory maps cannot be pickled, so a process that receives the heuristic maps the same files again
+        return load, ([db.file_name for db in self.databases], self.symmetric)
+
+    def heuristic(self, state):
+        h = max(db.lookup(state) for db in self.databases)
+        if self.symmetric:
+            for k in self.turns:
+                turned = self.transform(state, k)
+                h = max(h, max(db.lookup(turned) for db in self.databases))
+        return h
+
+if __name__ == "__main__":
+    main(parser.parse_args())
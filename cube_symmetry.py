@@ -0,0 +1,94 @@
+# cube_symmetry.py
+# The 48 symmetries of the cube (the 24 rotations of the whole cube, each with or without a mirror image). Turning the
+# whole cube, relabeling the colors to match and mirroring the moves gives a cube that is just as far from solved, so
+# states can be reduced to one representative per symmetry class, and solutions moved between them.
+
+from fractions import Fraction
+import itertools
+from cube_moves import MOVES, apply, parse
+
+# Position of each sticker in space (x to the right, y up, z towards the viewer of the F face), matching the
+# numbering of the stickers face by face (U, L, F, R, B, D) in the layout of the GUI
+_HALF = Fraction(3, 2)
+
+def _point(f):
+    face, i = divmod(f, 9)
+    row, col = divmod(i, 3)
+    return [(col - 1, _HALF, row - 1), (-_HALF, 1 - row, col - 1), (col - 1, 1 - row, _HALF),
+            (_HALF, 1 - row, 1 - col), (1 - col, 1 - row, -_HALF), (col - 1, -_HALF, 1 - row)][face]
+
+_POINTS = [_point(f) for f in range(54)]
+_INDEX = {p: f for f, p in enumerate(_POINTS)}
+
+def _symmetries():
+    '''Build the symmetries as (sticker permutation, face relabeling, move relabeling), from every way of permuting
+    and negating the three axes. The identity comes first.'''
+    symmetries = []
+    for axes in itertools.permutations(range(3)):
+        for signs in itertools.product([1, -1], repeat=3):
+            # the sticker at point p goes to the point with coordinates sign[i] * p[axes[i]]
+            perm = [0] * 54
+            for f, p in enumerate(_POINTS):
+                perm[_INDEX[tuple(s * p[a] for s, a in zip(signs, axes))]] = f
+            faces = [perm.index(9 * i + 4) // 9 for i in range(6)] # where each face center goes
+            perm = tuple(perm)
+
+            # the move that does the same to the turned cube as each move does to the cube (labels every sticker
+            # differently, so that a single comparison tells the moves apart)
+            labels = tuple(range(54))
+            moves = dict()
+            for move, move_perm in MOVES.items():
+                turned = apply(apply(labels, move_perm), perm)
+                moves[move] = next(m for m, p in MOVES.items() if apply(apply(labels, perm), p) == turned)
+            symmetries.append((perm, tuple(faces), moves))
+    return symmetries
+
+SYMMETRIES = _symmetries()
+
+# COMPOSE[a][b] is the symmetry that has the effect of applying symmetry b and then symmetry a
+_PERMS = {perm: k for k, (perm, _, _) in enumerate(SYMMETRIES)}
+COMPOSE = [[_PERMS[apply(SYMMETRIES[b][0], SYMMETRIES[a][0])] for b in range(48)] for a in range(48)]
+INVERSE = [row.index(0) for row in COMPOSE]
+
+# the identity and the two rotations of the whole cube about the corner URF, which take the U face to R, R to F and
+# F to U (or back); a mirror turns clockwise moves into counterclockwise ones
+DIAGONAL = [k for k, (_, faces, moves) in enumerate(SYMMETRIES) if moves['u'].islower()
+            and (faces[0], faces[3], faces[2]) in [(0, 3, 2), (3, 2, 0), (2, 0, 3)]]
+
+def transform(state, k):
+    '''Apply symmetry k to a cube state: turn (and maybe mirror) the whole cube, and relabel the colors so that
+    every face keeps the color of its center. Returns a tuple.'''
+    perm, faces, _ = SYMMETRIES[k]
+    return tuple([faces[state[i]] for i in perm])
+
+def transform_path(path, k):
+    '''Map a solution path of a state to the matching path of the state transformed by symmetry k.'''
+    moves = SYMMETRIES[k][2]
+    return "".join(moves[move] for move in parse(path))
+
+def canonical(state):
+    '''Find the representative of a state's symmetry class (the smallest transformed state), and the symmetry k
+    that transforms the state into it. The colors are normalized first (see normalize_colors).'''
+    state = normalize_colors(state)
+    return min((transform(state, k), k) for k in range(48))
+
+def normalize_colors(state):
+    '''Relabel the colors of a consistently recolored cube so that each face center has the color of its face
+    (face i has color i in the solved cube). Raises ValueError if two centers have the same color.'''
+    centers = [state[9 * i + 4] for i in range(6)]
+    if centers == list(range(6)):
+        return tuple(state)
+    if len(set(centers)) != 6:
+        raise ValueError(f"the face centers must all have different colors, not {centers}")
+    relabel = {color: i for i, color in enumerate(centers)}
+    return tuple(relabel[color] for color in state)
+
+def follow(steps, k):
+    '''Turn the moves of a search on representatives back into a path for the original state. The search started
+    from the state transformed by symmetry k, and each step (move, j) turned a representative by the move, then
+    transformed the new cube by symmetry j into the next representative.'''
+    path = []
+    for move, j in steps:
+        path.append(SYMMETRIES[INVERSE[k]][2][move])
+        k = COMPOSE[j][k]
+    return "".join(path)
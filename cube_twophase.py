@@ -0,0 +1,279 @@
+# cube_twophase.py
+# Kociemba's two-phase algorithm for the Rubik's cube. Phase 1 turns the cube into the subgroup G1 = <U, D, R2, L2, F2, B2>
+# (no twisted corners, no flipped edges, and the middle-layer edges in the middle layer), and phase 2 solves it using only
+# those moves. Both phases are IDA* searches over coordinates, with move tables and pruning tables that are built once
+# and cached on disk, so random scrambles are solved in under 25 moves (half turns count as one move).
+
+import argparse
+import array
+import itertools
+import math
+import os
+import time
+from codec import rank, unrank
+from cube_cubie import CUBIE_MOVES, from_stickers, is_valid
+from cube_moves import METRICS, SUCCESSORS, successors
+
+parser = argparse.ArgumentParser(description="Build the move and pruning tables of the two-phase cube solver")
+parser.add_argument('-o', '--output', help="file to write the tables to", default=None)
+
+MAX_LENGTH = 24  # solutions have at most this many moves
+IMPROVE_NODES = 50000  # after the first solution, nodes searched for shorter ones before the best is returned
+TABLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cube_twophase.tables')
+MAGIC = b'CUBE-2PH\x01'
+
+MOVES = METRICS['htm'] # all 18 moves, numbered by their index in this list
+PHASE2_MOVES = ['u', 'd', 'U', 'D', 'U2', 'D2', 'L2', 'R2', 'B2', 'F2'] # the moves that keep a cube in G1
+
+# The coordinates of each phase, with the number of values they take
+TWISTS = 3 ** 7 # corner orientations
+FLIPS = 2 ** 11 # edge orientations
+SLICES = 495 # positions of the 4 middle-layer edges (FR, FL, BL, BR), choose(12, 4)
+CORNERS = 40320 # corner permutations in G1, 8!
+EDGES = 40320 # permutations of the 8 U and D layer edges in G1, 8!
+SLICE_EDGES = 24 # permutations of the 4 middle-layer edges in G1, 4!
+
+SLICE_POSITIONS = list(itertools.combinations(range(12), 4))
+SLICE_INDEX = {positions: i for i, positions in enumerate(SLICE_POSITIONS)}
+SOLVED_SLICE = SLICE_INDEX[8, 9, 10, 11]
+
+# tables that have already been loaded by this process
+_loaded = dict() # {file name : Tables}
+
+def main(args):
+    start = time.perf_counter()
+    file_name = args.output or TABLES_FILE
+    write(file_name, build())
+    print(f'wrote {file_name} ({time.perf_counter() - start:.1f} s)')
+
+def solve(state, params, verbose=False, stats=None):
+    '''Solve the cube with the two-phase algorithm, and return a solution path of at most MAX_LENGTH moves and the number
+    of nodes expanded. The solution is not necessarily the shortest: once one is found, the search only goes on for
+    IMPROVE_NODES more nodes looking for shorter ones. The tables are built on first use (which takes a few seconds) and
+    cached on disk. If a stats dict is given, the number of nodes expanded in each phase is stored in it.'''
+    cube = from_stickers(state)
+    if not is_valid(cube):
+        raise ValueError("the cube cannot be solved (a corner is twisted, an edge flipped, or two cubies swapped)")
+    tables = load()
+
+    cp, co, ep, eo = cube
+    twist = flip = 0
+    for o in co[:7]:
+        twist = twist * 3 + o
+    for o in eo[:11]:
+        flip = flip * 2 + o
+    slice_ = SLICE_INDEX[tuple(p for p in range(12) if ep[p] >= 8)]
+
+    # phase 1 is searched deeper and deeper, and each way into G1 is handed to phase 2 with the moves that are left
+    # to beat the best solution so far
+    path = []
+    best = None
+    cnt = [0, 0] # nodes expanded in each phase
+    give_up = math.inf # number of nodes after which the search stops looking for shorter solutions
+
+    def phase1(twist, flip, slice_, g, depth):
+        '''Depth-first search for paths of exactly depth moves into G1, returning True once the search is over.'''
+        cnt[0] += 1
+        if sum(cnt) > give_up:
+            return True
+        h = max(tables.twist_slice[twist * SLICES + slice_], tables.flip_slice[flip * SLICES + slice_])
+        if h == 0 and g == depth:
+            # a path into G1 that ends with a phase 2 move is just a longer version of a shorter one
+            if not path or path[-1] not in PHASE2_MOVES:
+                phase2_start()
+            return best is not None and (len(best) <= depth or sum(cnt) > give_up)
+        if g + h > depth:
+            return False
+
+        for move in successors(path[-1] if path else None, path[-2] if len(path) > 1 else None, 'htm'):
+            m = tables.index[move]
+            path.append(move)
+            if phase1(tables.twist_move[twist * 18 + m], tables.flip_move[flip * 18 + m],
+                      tables.slice_move[slice_ * 18 + m], g + 1, depth):
+                return True
+            path.pop()
+        return False
+
+    def phase2_start():
+        '''Find the phase 2 coordinates of the cube at the end of the phase 1 path, and solve it in the moves that are left.'''
+        nonlocal best, give_up
+        c = cube
+        for move in path:
+            c = (tuple(c[0][p] for p in CUBIE_MOVES[move][0]), None, tuple(c[2][p] for p in CUBIE_MOVES[move][2]), None)
+        corners = rank(c[0])
+        edges = rank(c[2][:8])
+        slice_edges = rank([e - 8 for e in c[2][8:]])
+
+        limit = (MAX_LENGTH if best is None else len(best) - 1) - len(path)
+        start = len(path)
+        for depth in range(limit + 1):
+            if phase2(corners, edges, slice_edges, 0, depth):
+                if best is None:
+                    give_up = sum(cnt) + IMPROVE_NODES
+                best = path[:]
+                del path[start:]
+                return
+
+    def phase2(corners, edges, slice_edges, g, depth):
+        '''Depth-first search for a path of at most depth moves that solves a cube in G1 with phase 2 moves.'''
+        cnt[1] += 1
+        h = max(tables.corner_slice[corners * SLICE_EDGES + slice_edges], tables.edge_slice[edges * SLICE_EDGES + slice_edges])
+        if h == 0:
+            return True
+        if g + h > depth:
+            return False
+
+        for move in tables.phase2_successors[path[-1] if path else None, path[-2] if len(path) > 1 else None]:
+            m = tables.phase2_index[move]
+            path.append(move)
+            if phase2(tables.corner_move[corners * 10 + m], tables.edge_move[edges * 10 + m],
+                      tables.slice_edge_move[slice_edges * 10 + m], g + 1, depth):
+                return True
+            path.pop()
+        return False
+
+    for depth in range(MAX_LENGTH + 1):
+        if verbose:
+            print(f'  phase 1 depth {depth}')
+        if phase1(twist, flip, slice_, 0, depth) or (best is not None and len(best) <= depth + 1):
+            break
+    if best is None:
+        raise ValueError(f"no solution of at most {MAX_LENGTH} moves found")
+
+    if stats is not None:
+        stats['phase1'], stats['phase2'] = cnt
+    return "".join(best), sum(cnt)
+
+class Tables:
+    '''Move tables (the coordinate after each move, for every coordinate) and pruning tables (the fewest moves needed
+    to solve a pair of coordinates) of the two phases.'''
+
+    NAMES = ['twist_move', 'flip_move', 'slice_move', 'corner_move', 'edge_move', 'slice_edge_move',
+             'twist_slice', 'flip_slice', 'corner_slice', 'edge_slice']
+
+    def __init__(self, tables):
+        for name, table in zip(self.NAMES, tables):
+            setattr(self, name, table)
+        self.index = {move: m for m, move in enumerate(MOVES)}
+        self.phase2_index = {move: m for m, move in enumerate(PHASE2_MOVES)}
+
+        # the canonical phase 2 moves that may follow each pair of (last, before last) moves (see cube_moves.successors)
+        self.phase2_successors = {(last, before_last): tuple(move for move in moves if move in self.phase2_index)
+                                  for (metric, before_last, last), moves in SUCCESSORS.items() if metric == 'htm'}
+
+def build():
+    '''Build all the move and pruning tables, returning them in the order of Tables.NAMES.'''
+    moves = [CUBIE_MOVES[move] for move in MOVES]
+    phase2_moves = [CUBIE_MOVES[move] for move in PHASE2_MOVES]
+
+    # phase 1 move tables: the orientations are updated just like in cube_cubie.multiply, one coordinate at a time
+    twist_move = array.array('H', [0] * (TWISTS * 18))
+    for twist in range(TWISTS):
+        co = _digits(twist, 3, 8)
+        for m, (mcp, mco, _, _) in enumerate(moves):
+            twist_move[twist * 18 + m] = _number([(co[p] + o) % 3 for p, o in zip(mcp, mco)][:7], 3)
+
+    flip_move = array.array('H', [0] * (FLIPS * 18))
+    for flip in range(FLIPS):
+        eo = _digits(flip, 2, 12)
+        for m, (_, _, mep, meo) in enumerate(moves):
+            flip_move[flip * 18 + m] = _number([(eo[p] + o) % 2 for p, o in zip(mep, meo)][:11], 2)
+
+    slice_move = array.array('H', [0] * (SLICES * 18))
+    for slice_, positions in enumerate(SLICE_POSITIONS):
+        for m, (_, _, mep, _) in enumerate(moves):
+            slice_move[slice_ * 18 + m] = SLICE_INDEX[tuple(p for p in range(12) if mep[p] in positions)]
+
+    # phase 2 move tables, for the moves that keep the cube in G1 (and so keep each group of edges in its layers)
+    corner_move = array.array('H', [0] * (CORNERS * 10))
+    edge_move = array.array('H', [0] * (EDGES * 10))
+    for i in range(CORNERS):
+        perm = unrank(i, 8)
+        for m, (mcp, _, mep, _) in enumerate(phase2_moves):
+            corner_move[i * 10 + m] = rank([perm[p] for p in mcp])
+            edge_move[i * 10 + m] = rank([perm[p] for p in mep[:8]])
+
+    slice_edge_move = array.array('H', [0] * (SLICE_EDGES * 10))
+    for i in range(SLICE_EDGES):
+        perm = unrank(i, 4)
+        for m, (_, _, mep, _) in enumerate(phase2_moves):
+            slice_edge_move[i * 10 + m] = rank([perm[p - 8] for p in mep[8:]])
+
+    # pruning tables, by breadth-first search from the solved coordinates
+    twist_slice = _prune(twist_move, slice_move, TWISTS, SLICES, 18, 0 * SLICES + SOLVED_SLICE)
+    flip_slice = _prune(flip_move, slice_move, FLIPS, SLICES, 18, 0 * SLICES + SOLVED_SLICE)
+    corner_slice = _prune(corner_move, slice_edge_move, CORNERS, SLICE_EDGES, 10, 0)
+    edge_slice = _prune(edge_move, slice_edge_move, EDGES, SLICE_EDGES, 10, 0)
+
+    return [twist_move, flip_move, slice_move, corner_move, edge_move, slice_edge_move,
+            twist_slice, flip_slice, corner_slice, edge_slice]
+
+def _digits(number, base, n):
+    '''Orientations from an orientation coordinate: n - 1 digits, and a last digit that makes the sum a multiple of the base.'''
+    digits = []
+    for _ in range(n - 1):
+        number, digit = divmod(number, base)
+        digits.append(digit)
+    digits.reverse()
+    digits.append(-sum(digits) % base)
+    return digits
+
+def _number(digits, base):
+    '''Orientation coordinate from its digits.'''
+    number = 0
+    for digit in digits:
+        number = number * base + digit
+    return number
+
+def _prune(move_a, move_b, size_a, size_b, n_moves, goal):
+    '''Breadth-first search over pairs of coordinates (a, b), indexed a * size_b + b, returning the distance of every pair from the goal.'''
+    table = bytearray([0xFF]) * (size_a * size_b)
+    table[goal] = 0
+    layer = [goal]
+    distance = 0
+    while layer:
+        distance += 1
+        next_layer = []
+        for index in layer:
+            a, b = divmod(index, size_b)
+            a *= n_moves
+            b *= n_moves
+            for m in range(n_moves):
+                child = move_a[a + m] * size_b + move_b[b + m]
+                if table[child] == 0xFF:
+                    table[child] = distance
+                    next_layer.append(child)
+        layer = next_layer
+    return table
+
+def write(file_name, tables):
+    '''Write the tables to a file, one after the other in the order of Tables.NAMES.'''
+    with open(file_name, 'wb') as file:
+        file.write(MAGIC)
+        for table in tables:
+            file.write(table)
+
+def load(file_name=None):
+    '''Load the tables from a file, building and writing them first if the file does not exist yet.'''
+    file_name = file_name or TABLES_FILE
+    if file_name not in _loaded:
+        if not os.path.exists(file_name):
+            print(f'Building the two-phase tables in {file_name} (only needed once)...')
+            write(file_name, build())
+
+        sizes = [(TWISTS, 18, 'H'), (FLIPS, 18, 'H'), (SLICES, 18, 'H'), (CORNERS, 10, 'H'), (EDGES, 10, 'H'),
+                 (SLICE_EDGES, 10, 'H'), (TWISTS * SLICES, 1, 'B'), (FLIPS * SLICES, 1, 'B'),
+                 (CORNERS * SLICE_EDGES, 1, 'B'), (EDGES * SLICE_EDGES, 1, 'B')]
+        with open(file_name, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{file_name} is not a two-phase table file")
+            tables = []
+            for count, width, typecode in sizes:
+                table = array.array(typecode)
+                table.fromfile(file, count * width)
+                tables.append(table)
+        _loaded[file_name] = Tables(tables)
+    return _loaded[file_name]
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,34 @@
+# frontier.py
+# Heap-backed priority queue used as the open list of the search algorithms.
+
+import heapq
+import itertools
+
+class Frontier:
+    '''Min-priority queue of search nodes backed by a binary heap.
+    Nodes with equal priority come back out in the order they were pushed (FIFO),
+    so a search that uses the frontier always expands nodes in the same order.'''
+
+    def __init__(self):
+        self.heap = []  # items are (priority, insertion order, node)
+        self.counter = itertools.count()  # insertion order, used for tie-breaking
+
+    def push(self, node, priority):
+        '''Add a node to the frontier with the given priority, O(log F).'''
+        heapq.heappush(self.heap, (priority, next(self.counter), node))
+
+    def pop(self):
+        '''Remove and return the (node, priority) pair with the lowest priority, O(log F).'''
+        priority, _, node = heapq.heappop(self.heap)
+        return node, priority
+
+    def peek(self):
+        '''Return the (node, priority) pair with the lowest priority without removing it.'''
+        priority, _, node = self.heap[0]
+        return node, priority
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return len(self.heap) > 0
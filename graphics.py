@@ -182,8 +182,17 @@ BAD_OPTION = "Illegal option value"
 ##########################################################################
 # global variables and funtions
 
-_root = tk.Tk()
-_root.withdraw()
+# The hidden root window is created the first time it is needed, so that this
+# module can be imported on machines without a display.
+_root = None
+
+def _get_root():
+    global _root
+    if _root is None:
+        _root = tk.Tk()
+        _root.withdraw()
+        _root.update()  # MacOS fix 1 (see bottom of file)
+    return _root
 
 _update_lasttime = time.time()
 
@@ -198,7 +207,7 @@ def update(rate=None):
         else:
             _update_lasttime = now
 
-    _root.update()
+    _get_root().update()
 
 ############################################################################
 # Graphics classes start here
@@ -210,7 +219,7 @@ class GraphWin(tk.Canvas):
     def __init__(self, title="Graphics Window",
                  width=200, height=200, autoflush=True):
         assert type(title) == type(""), "Title must be a string"
-        master = tk.Toplevel(_root)
+        master = tk.Toplevel(_get_root())
         master.protocol("WM_DELETE_WINDOW", self.close)
         tk.Canvas.__init__(self, master, width=width, height=height,
                            highlightthickness=0, bd=0)
@@ -231,7 +240,7 @@ class GraphWin(tk.Canvas):
         self.closed = False
         master.lift()
         self.lastKey = ""
-        if autoflush: _root.update()
+        if autoflush: _get_root().update()
 
     def __repr__(self):
         if self.isClosed():
@@ -296,7 +305,7 @@ class GraphWin(tk.Canvas):
 
     def __autoflush(self):
         if self.autoflush:
-            _root.update()
+            _get_root().update()
 
 
     def plot(self, x, y, color="black"):
@@ -499,7 +508,7 @@ class GraphicsObject:
         self.id = self._draw(graphwin, self.config)
         graphwin.addItem(self)
         if graphwin.autoflush:
-            _root.update()
+            _get_root().update()
         return self
 
 
@@ -513,7 +522,7 @@ class GraphicsObject:
             self.canvas.delete(self.id)
             self.canvas.delItem(self)
             if self.canvas.autoflush:
-                _root.update()
+                _get_root().update()
         self.canvas = None
         self.id = None
 
@@ -535,7 +544,7 @@ class GraphicsObject:
                 y = dy
             self.canvas.move(self.id, x, y)
             if canvas.autoflush:
-                _root.update()
+                _get_root().update()
 
     def _reconfig(self, option, setting):
         # Internal method for changing configuration of the object
@@ -548,7 +557,7 @@ class GraphicsObject:
         if self.canvas and not self.canvas.isClosed():
             self.canvas.itemconfig(self.id, options)
             if self.canvas.autoflush:
-                _root.update()
+                _get_root().update()
 
 
     def _draw(self, canvas, options):
@@ -802,7 +811,7 @@ class Entry(GraphicsObject):
         self.anchor = p.clone()
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = tk.StringVar(_get_root())
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -897,10 +906,10 @@ class Image(GraphicsObject):
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
         if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+            self.img = tk.PhotoImage(file=pixmap[0], master=_get_root())
         else: # width and height provided
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = tk.PhotoImage(master=_get_root(), width=width, height=height)
 
     def __repr__(self):
         return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
@@ -1023,8 +1032,7 @@ def test():
 #MacOS fix 2
 #tk.Toplevel(_root).destroy()
 
-# MacOS fix 1
-update()
+# MacOS fix 1 (update the root once) now happens when _get_root() creates it
 
 if __name__ == "__main__":
     test()
@@ -4,16 +4,17 @@
 import pdb
 import argparse
 from graphics import *
-from matplotlib import cm
 import pdb
-from queue import PriorityQueue
 import random
 import time
-from collections import deque
+from pancakes_core import ASTAR_MAX_PANCAKES, METHODS, headless, flip_stack, search, solve
 
 parser = argparse.ArgumentParser(description="Use greedy best-first search (GBFS) to optimally flip a stack of pancakes")
 parser.add_argument('-n', '--num', metavar='pancakes', type=int, help="number of pancakes", default=8)
 parser.add_argument('--seed', type=int, help="seed for randomly arranging pancakes initially")
+parser.add_argument('--headless', action='store_true', help="solve the stack and print the solution without opening a window")
+parser.add_argument('--method', choices=list(METHODS), default='gbfs', help="search method used by --headless")
+parser.add_argument('--pdb', help="pattern database file (see pancakes_pdb.py) used by --headless with the optimal method")
 
 def main(args):
 
@@ -35,8 +36,12 @@ def main(args):
             elif key == 'd':  # debug the program
                 pdb.set_trace()
             elif key == 'g':  # run greedy best-first search
-                path, cnt = gbfs(gui, stack)
-                print(f'searched {cnt} paths')
+                path, cnt, rate = gbfs(gui, stack)
+                print(f'searched {cnt} paths ({rate:.0f} nodes/sec)')
+                print(f'solution: {path}')
+            elif key == 'o':  # run optimal search (A*/IDA* with the gap heuristic)
+                path, cnt, rate = optimal(gui, stack)
+                print(f'searched {cnt} paths ({rate:.0f} nodes/sec)')
                 print(f'solution: {path}')
             elif key in [str(i) for i in range(1, n + 1)]:  # manually flip some of the pancakes
                 stack = flip(gui, stack, int(key))
@@ -58,7 +63,7 @@ def guisetup(stack):
     draw_pancakes(gui, stack, n)
 
     # Add text objects for instructions and status updates
-    instructions = Text(Point(10, hei - 12), "Press a # to flip pancakes, 'g' to run GBFS, Escape to quit")
+    instructions = Text(Point(10, hei - 12), "Press a # to flip pancakes, 'g' to run GBFS, 'o' for optimal, Escape to quit")
     instructions._reconfig("anchor", "w")
     instructions.setSize(8)
     instructions.draw(gui)
@@ -85,60 +90,27 @@ def flip(gui, stack, p, update_gui=True):
 
     return stack
 
-def flip_stack(stack, p):
-    '''Flip p pancakes in an ordered stack.'''
-    # strategy here is to take p pancakes off of the stack, add them to a queue, 
-    # and add p items from the queue back onto the stack, which will result in the 
-    # p number of pancakes flipped on the stack
-
-    # temp queue
-    queue = []
-    stack_copy = stack.copy()
-
-    # popping p items of the stack
-    for _ in range(p):
-        queue.insert(0, stack_copy.pop(0))
-
-    # popping all items from the stack back onto the queue
-    for _ in range(len(queue)):
-        stack_copy.insert(0, queue.pop())
-
-    return stack_copy
-
-
-
-def calc_cost(stack):
-    '''Compute the cost h(stack) for a given stack of pancakes.
-    Here, we define cost as the number of pancakes in the wrong position.'''
-    # ***MODIFY CODE HERE*** (2 lines)
-    
-    # iterate through both the given stack, and a solved stack, and then count 
-    # the values that do not match
-    h = 0 # heuristic value
-    correct_spots = [a for a in range(len(stack))] #[0,1,2,3,4,5,6, ... len(stack) - 1]
-    for i in range(len(stack)):
-        h += 1 if correct_spots[i] != stack[i] else 0
-    return h
+def find_status(gui):
+    '''Find the status text object in the GUI'''
+    # Get graphics objects from GUI
+    objects = gui.items
+    # since objects will be in random order, we have to iterate to specifically
+    # find the text object we are looking to update
+    for obj in objects:
+        if type(obj) == Text and obj.getText() != "Press a # to flip pancakes, 'g' to run GBFS, 'o' for optimal, Escape to quit":
+            return obj
 
 def gbfs(gui, stack):
     '''Wrapper function for the GBFS calculations'''
     print("Running greedy best-first search...")
 
 
-    # Get graphics objects from GUI
-    objects = gui.items
-    status = None
-    # since objects will be in random order, we have to iterate to specifically
-    # find the text object we are looking to update
-    for obj in objects:
-        if type(obj) == Text and obj.getText() != "Press a # to flip pancakes, 'g' to run GBFS, Escape to quit":
-            status = obj
-            break
+    status = find_status(gui)
 
     # check if we even need to solve the game
     if stack == [a for a in range(len(stack))]:
         status.setText("The given state is already solved!")
-        return
+        return [], 0, 0
 
 
     # Update status text on GUI
@@ -146,89 +118,36 @@ def gbfs(gui, stack):
     time.sleep(0.5)
 
     # ***MODIFY CODE HERE*** (20-25 lines)
+    start = time.perf_counter()
     path, cnt  = search(stack)
+    rate = cnt / max(time.perf_counter() - start, 1e-9) # expansion rate in nodes/sec
     
 
     status.setText("...search is complete")
-    return path, cnt
-
+    return path, cnt, rate
 
-def search(state):
-    '''Run greedy best-first search on a stack of pancakes and return the solution path.'''
 
-    initial_state = state.copy()
-    cnt = 0
-    backpointers = dict()
-
-    # unique id to associate with ever stack state that we encounter
-    id = 0
-    
-    # add the starting node to the visited look up table and the queue
-    visited = {id:state.copy()} # {id : stack} a look up table for all vistited states
+def optimal(gui, stack):
+    '''Wrapper function for the optimal (A*/IDA*) search calculations'''
+    method = "A*" if len(stack) <= ASTAR_MAX_PANCAKES else "IDA*"
+    print(f"Running {method} search...")
 
-    # queue consists of ids corresponding to state, and a cost associated with the h(state)
-    queue = deque([[id, calc_cost(visited[id])]])  # items are [id(state), h(state)]
-    id += 1
-
-    while True:
-        cnt += 1
-
-        # get current node
-        node_id, node_cost = queue.pop()
-        node = visited[node_id].copy() # node is a stack of pancakes (integers), and represents the current state
-
-        # check if we have solved the game
-        if node_cost == 0:
-            # if so, generate the path we took by traversing through backpointers
-            path = ""
-
-            # we are backward chaining! so we need to reverse our steps untill we are at the starting state
-            while node != initial_state:
-                
-                # get parent
-                parent_id = backpointers[node_id]
-                parent = visited[parent_id]
-                
-                # find the move made between the current node and the parent
-                move = find_move(node, parent) 
-
-                # update path
-                path += str(move)
-
-                # update the current node
-                node_id = parent_id
-                node = parent
-
-            return path[::-1], cnt # we want to reverse the path because we are backward chaining
-
-
-        # for the given node, find every possible move we can make
-        moves = [a for a in range(2, len(node) + 1)]
-
-        # for each move, pruduce a resulting child
-        for move in moves:
-            child = flip_stack(node.copy(), move)
-            child_cost = calc_cost(child)
-
-            # check if we have visited the child
-            if child not in visited.values():
-
-                # if we have not, update the visited, and add them to the queue
-                child_id = id
-                id += 1
-                queue.appendleft([child_id, child_cost])
-                visited[child_id] = child
-                backpointers[child_id] = node_id
+    # Update status text on GUI
+    status = find_status(gui)
+    status.setText(f"Running {method} search...")
 
+    start = time.perf_counter()
+    path, cnt = solve(stack)
+    rate = cnt / max(time.perf_counter() - start, 1e-9) # expansion rate in nodes/sec
 
-        # sort the queue
-        queue = deque(sorted(queue, key=lambda pair : pair[1], reverse=True))
+    status.setText(f"...search is complete ({len(path)} flips)")
+    return path, cnt, rate
 
 
 def simulate(stack, path, gui):
-    '''Simulate the flipping of pancakes to determine the resulting stack.'''
+    '''Simulate the flipping of pancakes to determine the resulting stack. The path is a list of flips (number of pancakes).'''
     for action in path:
-        stack = flip_stack(stack, int(action))
+        stack = flip_stack(stack, action)
         draw_pancakes(gui, stack, len(stack))
         time.sleep(0.01)
 
@@ -240,6 +159,7 @@ def draw_pancakes(gui, stack, n):
 
     # Draw pancakes
     # ***ENTER CODE HERE*** ("10" lines) (I feel like we saved code duplication in the long run)
+    from matplotlib import cm  # imported here so that the search code can be used without matplotlib
     cmap = cm.get_cmap('YlOrBr', n + 1)
     colors = [cmap.__call__(i) for i in range(n)]
     old_lines = [obj for obj in gui.items if type(obj) == Line]
@@ -286,24 +206,9 @@ def draw_pancakes(gui, stack, n):
         pancake.draw(gui)
 
 
-def find_move(state1, state2):
-    '''Looks at two board states, and determines how many pancakes need to be flipped to produce the other state'''
-
-    # here, we iterate through both states backward, and stop counting when we find 
-    # values that do not match
-    count_same = 0
-    i = len(state1) - 1
-
-    if state1 == state2:
-        return 0
-
-    while state1[i] == state2[i]:
-        count_same += 1
-        i -= 1
-
-    return len(state1) - count_same
-        
-
-
 if __name__ == "__main__":
-    main(parser.parse_args())
+    args = parser.parse_args()
+    if args.headless:
+        headless(args)
+    else:
+        main(args)
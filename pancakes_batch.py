@@ -0,0 +1,117 @@
+# pancakes_batch.py
+# Solve many stacks of pancakes across all cores, reading one stack per line and writing JSONL results.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pancakes_core import METHODS, get_solver
+
+parser = argparse.ArgumentParser(description="Solve a file of pancake stacks (one per line) in parallel and write the results as JSONL")
+parser.add_argument('stacks', help="text file with one stack per line, e.g. '3 0 2 1' ('-' for stdin)")
+parser.add_argument('-o', '--output', help="file to write the JSONL results to (default: stdout)")
+parser.add_argument('-m', '--method', choices=list(METHODS), default='optimal', help="search method used to solve each stack")
+parser.add_argument('--pdb', help="pattern database file (see pancakes_pdb.py), memory-mapped and shared by the workers (optimal method only)")
+parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+parser.add_argument('-c', '--chunksize', type=int, default=16, help="number of stacks sent to a worker at a time")
+parser.add_argument('--unordered', action='store_true', help="write results as soon as they complete instead of in input order")
+
+def main(args):
+    stacks = sys.stdin if args.stacks == '-' else open(args.stacks, 'r')
+    out = sys.stdout if args.output is None else open(args.output, 'w')
+    try:
+        for result in batch(stacks, args.method, args.workers, args.chunksize, ordered=not args.unordered, pdb_file=args.pdb):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+    finally:
+        if stacks is not sys.stdin:
+            stacks.close()
+        if out is not sys.stdout:
+            out.close()
+
+def batch(lines, method='optimal', workers=None, chunksize=16, ordered=True, pdb_file=None):
+    '''Solve the stacks read from an iterable of lines across a pool of worker processes, yielding a result dict per stack.
+    Lines are read lazily, and only a bounded number of chunks are in flight (or waiting to be written in order) at once,
+    so arbitrarily large files can be streamed through.'''
+    workers = workers or os.cpu_count()
+    limit = workers * 4  # chunks submitted but not yet written
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        finished = dict() # {chunk number : results}, for chunks that completed before an earlier chunk
+        next_chunk = 0 # next chunk to write when the results are ordered
+
+        def collect():
+            '''Wait for at least one chunk to complete, and return the results that are ready to be written.'''
+            nonlocal pending, next_chunk
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            ready = []
+            for future in done:
+                number, results = future.result()
+                if not ordered:
+                    ready += results
+                    continue
+                finished[number] = results
+                while next_chunk in finished:
+                    ready += finished.pop(next_chunk)
+                    next_chunk += 1
+            return ready
+
+        for number, chunk in enumerate(read_chunks(lines, chunksize)):
+            pending.add(pool.submit(solve_chunk, number, chunk, method, pdb_file))
+            while len(pending) + len(finished) >= limit:
+                yield from collect()
+
+        while pending:
+            yield from collect()
+
+def read_chunks(lines, chunksize):
+    '''Group the stacks from an iterable of lines into chunks of (index, line) pairs, skipping blank lines and comments.'''
+    chunk = []
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        chunk.append((index, line))
+        index += 1
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def solve_chunk(number, chunk, method, pdb_file=None):
+    '''Solve a chunk of stacks in a worker process, returning the chunk number and a result dict per stack.'''
+    solver = get_solver(method, pdb_file)  # pattern databases are mapped once per worker process
+    results = []
+    for index, line in chunk:
+        try:
+            stack = parse_stack(line)
+        except ValueError as error:
+            results.append({'index': index, 'stack': line, 'error': str(error)})
+            continue
+
+        # a stack the solver rejects (e.g. of another size than the pattern database) fails on its own,
+        # without losing the rest of the chunk
+        start = time.perf_counter()
+        try:
+            path, cnt = solver(stack)
+        except Exception as error:
+            results.append({'index': index, 'stack': stack, 'error': str(error)})
+            continue
+        results.append({'index': index, 'stack': stack, 'path': path, 'expansions': cnt,
+                        'time': time.perf_counter() - start})
+    return number, results
+
+def parse_stack(line):
+    '''Parse a stack of pancakes written as integers separated by spaces and/or commas.'''
+    stack = [int(p) for p in line.replace(',', ' ').split()]
+    if sorted(stack) != list(range(len(stack))):
+        raise ValueError(f"not a stack of pancakes 0..{len(stack) - 1}: {line}")
+    return stack
+
+if __name__ == "__main__":
+    main(parser.parse_args())
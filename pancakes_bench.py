@@ -0,0 +1,158 @@
+# pancakes_bench.py
+# Benchmark the pancake solving modes on seeded random stacks, and compare the results against a saved baseline.
+
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from pancakes_core import METHODS, get_solver, make_stack
+
+parser = argparse.ArgumentParser(description="Benchmark the pancake solvers on seeded random stacks")
+parser.add_argument('-m', '--methods', nargs='+', choices=list(METHODS), default=['optimal'], help="solving modes to benchmark")
+parser.add_argument('-n', '--sizes', nargs='+', type=int, default=[8, 12, 16, 24, 32, 48, 64], help="numbers of pancakes")
+parser.add_argument('-s', '--seeds', type=int, default=5, help="number of seeded stacks per size (seeds 0, 1, ...)")
+parser.add_argument('--pdb', help="pattern database file used by the optimal method (see pancakes_pdb.py)")
+parser.add_argument('-t', '--timeout', type=float, default=60, help="seconds allowed for each run before it is stopped")
+parser.add_argument('--no-memory', action='store_true', help="skip the (slower) second run that measures peak memory")
+parser.add_argument('-o', '--output', help="file to save the results to (.csv or .json)")
+parser.add_argument('-c', '--compare', help="baseline results file (.csv or .json) to check for regressions")
+parser.add_argument('--tolerance', type=float, default=0.25, help="relative slowdown/growth allowed before a result counts as a regression")
+
+MIN_SLOWDOWN = 0.01  # seconds; smaller differences in time are timing noise, not regressions
+FIELDS = ['method', 'n', 'seed', 'status', 'expansions', 'generated', 'length', 'time', 'peak_kb']
+
+def main(args):
+    results = []
+    for method in args.methods:
+        for n in args.sizes:
+            for seed in range(args.seeds):
+                result = run(method, n, seed, args.pdb if method == 'optimal' else None, args.timeout, not args.no_memory)
+                results.append(result)
+                print(format_result(result))
+                sys.stdout.flush()
+
+    if args.output:
+        save(args.output, results)
+        print(f'saved {len(results)} results to {args.output}')
+
+    if args.compare:
+        regressions = compare(load(args.compare), results, args.tolerance)
+        for message in regressions:
+            print('REGRESSION:', message)
+        print(f'{len(regressions)} regressions against {args.compare}')
+        if regressions:
+            sys.exit(1)
+
+def run(method, n, seed, pdb_file=None, timeout=60, memory=True):
+    '''Solve one seeded stack in a separate process (so that a run can be stopped, and memory is measured
+    from a clean slate), and return a result dict with the fields in FIELDS. The timed run and the memory run
+    each get the timeout; if only the memory run runs out of time, the result is kept with no peak_kb.'''
+    result = {'method': method, 'n': n, 'seed': seed, 'status': 'timeout', 'expansions': None,
+              'generated': None, 'length': None, 'time': None, 'peak_kb': None}
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(target=measure, args=(sender, method, n, seed, pdb_file, memory))
+    worker.start()
+    sender.close()
+    if receiver.poll(timeout):
+        try:
+            result.update(receiver.recv())
+        except EOFError:  # the worker died without sending a result
+            result['status'] = 'error'
+
+    # the peak memory follows in a second message, once the slower run under tracemalloc is done
+    if memory and result['status'] == 'ok' and receiver.poll(timeout):
+        try:
+            result.update(receiver.recv())
+        except EOFError:
+            pass
+    worker.terminate()
+    worker.join()
+    return result
+
+def measure(sender, method, n, seed, pdb_file, memory):
+    '''Worker process: time one solve, then optionally repeat it under tracemalloc to find the peak memory.'''
+    solver = get_solver(method, pdb_file)
+    stack = make_stack(n, seed)
+
+    stats = dict()
+    start = time.perf_counter()
+    path, cnt = solver(stack, stats=stats)
+    result = {'status': 'ok', 'expansions': cnt, 'generated': stats.get('generated'), 'length': len(path),
+              'time': time.perf_counter() - start}
+    sender.send(result)
+
+    # tracemalloc slows the search down a lot, so memory is measured on a separate run, sent on its own
+    if memory:
+        tracemalloc.start()
+        solver(stack)
+        sender.send({'peak_kb': tracemalloc.get_traced_memory()[1] / 1024})
+        tracemalloc.stop()
+
+def format_result(result):
+    '''Format a result as a line of text.'''
+    if result['status'] != 'ok':
+        return f"{result['method']:>13} n={result['n']:<3} seed={result['seed']:<3} {result['status']}"
+    peak = '-' if result['peak_kb'] is None else f"{result['peak_kb']:.0f} KB"
+    return (f"{result['method']:>13} n={result['n']:<3} seed={result['seed']:<3} length={result['length']:<3} "
+            f"expansions={result['expansions']:<8} generated={result['generated']:<9} time={result['time']:.4f} s peak={peak}")
+
+def save(file_name, results):
+    '''Save results to a CSV or JSON file, depending on the file extension.'''
+    with open(file_name, 'w', newline='') as file:
+        if file_name.endswith('.json'):
+            json.dump(results, file, indent=1)
+        else:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+def load(file_name):
+    '''Load results saved by save().'''
+    with open(file_name, 'r', newline='') as file:
+        if file_name.endswith('.json'):
+            return json.load(file)
+
+        results = []
+        for row in csv.DictReader(file):
+            for field in ['n', 'seed', 'expansions', 'generated', 'length']:
+                row[field] = int(row[field]) if row[field] else None
+            for field in ['time', 'peak_kb']:
+                row[field] = float(row[field]) if row[field] else None
+            results.append(row)
+        return results
+
+def compare(baseline, results, tolerance=0.25):
+    '''Compare results against a baseline run on the same instances, and return a message for each regression:
+    a run that no longer finishes, a longer solution, more expansions, or time/memory beyond the tolerance.'''
+    before = {(b['method'], b['n'], b['seed']): b for b in baseline}
+    regressions = []
+    for result in results:
+        key = (result['method'], result['n'], result['seed'])
+        if key not in before:
+            continue
+        old = before[key]
+        name = f"{result['method']} n={result['n']} seed={result['seed']}"
+
+        if old['status'] == 'ok' and result['status'] != 'ok':
+            regressions.append(f"{name} {result['status']} (was ok)")
+            continue
+        if result['status'] != 'ok' or old['status'] != 'ok':
+            continue
+
+        if result['length'] > old['length']:
+            regressions.append(f"{name} solution length {old['length']} -> {result['length']}")
+        if result['expansions'] > old['expansions']:
+            regressions.append(f"{name} expansions {old['expansions']} -> {result['expansions']}")
+        if result['time'] > old['time'] * (1 + tolerance) and result['time'] - old['time'] > MIN_SLOWDOWN:
+            regressions.append(f"{name} time {old['time']:.4f} s -> {result['time']:.4f} s")
+        if result['peak_kb'] is not None and old['peak_kb'] is not None and result['peak_kb'] > old['peak_kb'] * (1 + tolerance):
+            regressions.append(f"{name} peak memory {old['peak_kb']:.0f} KB -> {result['peak_kb']:.0f} KB")
+
+    return regressions
+
+if __name__ == "__main__":
+    main(parser.parse_args())
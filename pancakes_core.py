@@ -0,0 +1,325 @@
+# pancakes_core.py
+# Search algorithms for flipping pancakes, with no graphical user interface so that
+# they can be imported quickly in batch jobs, worker processes and servers.
+
+import math
+import random
+import time
+from frontier import Frontier
+from codec import encode, decode
+
+ASTAR_MAX_PANCAKES = 12  # larger stacks are solved optimally with IDA*, which needs far less memory
+
+def headless(args):
+    '''Solve a stack of pancakes from the command line arguments and print the results, without a GUI.'''
+    stack = make_stack(args.num, args.seed)
+    print(f'stack: {stack}')
+
+    start = time.perf_counter()
+    path, cnt = get_solver(args.method, args.pdb)(stack)
+    elapsed = time.perf_counter() - start
+
+    print(f'searched {cnt} paths ({cnt / max(elapsed, 1e-9):.0f} nodes/sec)')
+    print(f'solution: {path}')
+
+def get_solver(method, pdb_file=None):
+    '''Look up a solving mode by name, optionally using the pattern databases in pdb_file (optimal mode only).'''
+    if pdb_file is None:
+        return METHODS[method]
+    if method != 'optimal':
+        raise ValueError(f"pattern databases can only be used with the optimal method, not {method}")
+
+    from pancakes_pdb import load  # only needed when a pattern database is used
+    pdb = load(pdb_file)
+    return lambda state, stats=None: solve(state, pdb, stats)
+
+def make_stack(n, seed=None):
+    '''Make a stack of n pancakes, randomly arranged if a seed is given.'''
+    stack = list(range(n))
+    if seed is not None:
+        random.seed(seed)
+        random.shuffle(stack)
+    return stack
+
+def flip_stack(stack, p):
+    '''Flip p pancakes in an ordered stack (list or tuple), returning a new stack of the same type.'''
+    # the top p pancakes are reversed and put back on top of the rest of the stack
+    return stack[p - 1::-1] + stack[p:] if p > 0 else stack[:]
+
+def calc_cost(stack):
+    '''Compute the cost h(stack) for a given stack of pancakes.
+    Here, we define cost as the number of pancakes in the wrong position.'''
+    # ***MODIFY CODE HERE*** (2 lines)
+    
+    # iterate through both the given stack, and a solved stack, and then count 
+    # the values that do not match
+    h = 0 # heuristic value
+    correct_spots = [a for a in range(len(stack))] #[0,1,2,3,4,5,6, ... len(stack) - 1]
+    for i in range(len(stack)):
+        h += 1 if correct_spots[i] != stack[i] else 0
+    return h
+
+def search(state, stats=None):
+    '''Run greedy best-first search on a stack of pancakes and return the solution path (list of flips).
+    If a stats dict is given, the number of child nodes generated is stored in it.'''
+
+    # stacks are stored in the search tables as compact codes (see codec.py) rather than lists
+    n = len(state)
+    initial_code = encode(state)
+    cnt = 0
+    generated = 0
+
+    # add the starting node to the visited look up table and the queue
+    # visited is a hash table keyed by the encoded stack, so checking whether we have already
+    # seen a stack is O(1), and it doubles as our backpointers
+    visited = {initial_code: None} # {code(stack) : (code(parent stack), move)}
+
+    # queue consists of encoded stacks, prioritized by the cost h(state)
+    queue = Frontier()
+    queue.push(initial_code, calc_cost(state))
+
+    while True:
+        cnt += 1
+
+        # get current node
+        code, node_cost = queue.pop()
+        node = decode(code, n) # node is a stack of pancakes (integers), and represents the current state
+
+        # check if we have solved the game
+        if node_cost == 0:
+            # if so, generate the path we took by traversing through backpointers
+            path = []
+
+            # we are backward chaining! so we need to reverse our steps untill we are at the starting state
+            while code != initial_code:
+                
+                # get parent, and the move (number of pancakes flipped) that produced the current node
+                code, move = visited[code]
+
+                # update path
+                path.append(move)
+
+            if stats is not None:
+                stats['generated'] = generated
+            return path[::-1], cnt # we want to reverse the path because we are backward chaining
+
+
+        # for the given node, find every possible move we can make
+        moves = [a for a in range(2, len(node) + 1)]
+        generated += len(moves)
+
+        # for each move, pruduce a resulting child
+        for move in moves:
+            child = flip_stack(node, move)
+            child_code = encode(child)
+
+            # check if we have visited the child
+            if child_code not in visited:
+
+                # if we have not, update the visited, and add them to the queue
+                visited[child_code] = (code, move)
+                queue.push(child_code, calc_cost(child))
+
+def calc_gaps(stack):
+    '''Compute the gap heuristic h(stack) for a given stack of pancakes.
+    A gap is a pair of adjacent pancakes that are not consecutive in size, counting the
+    plate as pancake n underneath the bottom pancake. Each flip can close at most one gap,
+    so this never overestimates the number of flips left (admissible).'''
+    n = len(stack)
+    below = list(stack[1:]) + [n] # the pancake (or plate) under each pancake
+    return sum(abs(a - b) != 1 for a, b in zip(stack, below))
+
+def solve(state, pdb=None, stats=None):
+    '''Optimally solve a stack of pancakes, using A* for small stacks and IDA* for larger ones.'''
+    if len(state) <= ASTAR_MAX_PANCAKES:
+        return astar(state, pdb, stats)
+    return idastar(state, pdb, stats)
+
+def bidirectional(state, stats=None):
+    '''Run bidirectional breadth-first search from both the stack and the sorted stack, and return a shortest
+    solution path (list of flips) and the number of nodes expanded. Flips are their own inverse, so the backward
+    search uses the same moves, and the two searches meet in the middle after about half the depth each.
+    If a stats dict is given, the number of child nodes generated is stored in it.'''
+
+    n = len(state)
+    start = encode(state)
+    goal = encode(list(range(n)))
+    cnt = 0
+    generated = 0
+    if start == goal:
+        if stats is not None:
+            stats['generated'] = generated
+        return [], cnt
+
+    # one visited table per direction, doubling as the backpointers
+    forward = {start: (None, None, 0)} # {code(stack) : (code(parent stack), move, depth)}
+    backward = {goal: (None, None, 0)}
+    forward_layer = [start]
+    backward_layer = [goal]
+
+    while forward_layer and backward_layer:
+        # always grow the side with the smaller frontier
+        if len(forward_layer) <= len(backward_layer):
+            visited, other, layer = forward, backward, forward_layer
+        else:
+            visited, other, layer = backward, forward, backward_layer
+
+        next_layer = []
+        for code in layer:
+            cnt += 1
+            node = decode(code, n)
+            depth = visited[code][2]
+            for move in range(2, n + 1):
+                generated += 1
+                child_code = encode(flip_stack(node, move))
+                if child_code in visited:
+                    continue
+                visited[child_code] = (code, move, depth + 1)
+
+                # every stack within the other search's radius is already in its table, so the first
+                # stack both searches have reached lies on a shortest path
+                if child_code in other:
+                    if stats is not None:
+                        stats['generated'] = generated
+                    return join_paths(forward, backward, child_code), cnt
+                next_layer.append(child_code)
+
+        if visited is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+def join_paths(forward, backward, meet):
+    '''Join the paths from the forward and backward searches at the stack where they met.'''
+    # walk back to the starting stack, and reverse
+    path = []
+    code = meet
+    while forward[code][0] is not None:
+        code, move, _ = forward[code]
+        path.append(move)
+    path.reverse()
+
+    # walk on to the sorted stack, undoing each backward flip by repeating it
+    code = meet
+    while backward[code][0] is not None:
+        code, move, _ = backward[code]
+        path.append(move)
+    return path
+
+def astar(state, pdb=None, stats=None):
+    '''Run A* search with the gap heuristic and return an optimal solution path (list of flips) and the number of nodes expanded.
+    If pattern databases are given (see pancakes_pdb.py), the heuristic is the larger of the gaps and the pattern distances.
+    If a stats dict is given, the number of child nodes generated is stored in it.'''
+
+    n = len(state)
+    initial_code = encode(state)
+    cnt = 0
+    generated = 0
+
+    # visited doubles as the backpointers and remembers the cheapest cost g(stack) found so far
+    visited = {initial_code: (None, None, 0)} # {code(stack) : (code(parent stack), move, g(stack))}
+
+    # queue is prioritized by f = g + h, breaking ties in favour of the smaller h (deeper nodes)
+    queue = Frontier()
+    h = calc_gaps(state) if pdb is None else max(calc_gaps(state), pdb.heuristic(state))
+    queue.push(initial_code, (h, h))
+
+    while queue:
+        code, (f, h) = queue.pop()
+        g = f - h
+
+        # skip stale queue entries for stacks that were since reached by a cheaper path
+        if g > visited[code][2]:
+            continue
+        cnt += 1
+        node = decode(code, n)
+
+        # check if we have solved the game
+        if h == 0:
+            path = []
+            while code != initial_code:
+                code, move, _ = visited[code]
+                path.append(move)
+            if stats is not None:
+                stats['generated'] = generated
+            return path[::-1], cnt # backward chaining, so reverse the path
+
+        generated += n - 1
+        for move in range(2, n + 1):
+            child = flip_stack(node, move)
+            child_code = encode(child)
+            if child_code not in visited or g + 1 < visited[child_code][2]:
+                visited[child_code] = (code, move, g + 1)
+                child_h = calc_gaps(child) if pdb is None else max(calc_gaps(child), pdb.heuristic(child))
+                queue.push(child_code, (g + 1 + child_h, child_h))
+
+def idastar(state, pdb=None, stats=None):
+    '''Run IDA* search with the gap heuristic and return an optimal solution path (list of flips) and the number of nodes expanded.
+    Only the current stack and path are kept in memory, so this scales to much larger stacks than A*.
+    If pattern databases are given (see pancakes_pdb.py), the heuristic is the larger of the gaps and the pattern distances.
+    If a stats dict is given, the number of child nodes generated is stored in it.'''
+
+    stack = list(state)  # flipped in place as we go down the search tree, and flipped back on the way up
+    n = len(stack)
+    path = []
+    cnt = 0
+    generated = 0
+
+    def dfs(g, gaps, bound):
+        '''Depth-first search below the current stack, returning True when solved, or else the smallest f that exceeded the bound.'''
+        nonlocal cnt, generated
+        cnt += 1
+        if gaps == 0:
+            return True
+
+        # flipping the top p pancakes only changes the gap under the p-th pancake,
+        # so the gaps of each child can be updated in constant time
+        children = []
+        for move in range(2, n + 1):
+            if path and move == path[-1]:
+                continue # flipping the same pancakes twice just undoes the last move
+            below = stack[move] if move < n else n
+            child_gaps = gaps - (abs(stack[move - 1] - below) != 1) + (abs(stack[0] - below) != 1)
+            children.append((child_gaps, move))
+        children.sort()
+        generated += len(children)
+
+        minimum = math.inf
+        for child_gaps, move in children:
+            f = g + 1 + child_gaps
+            if f > bound:
+                minimum = min(minimum, f)
+                continue
+
+            stack[:move] = stack[move - 1::-1]
+            if pdb is not None:
+                # the pattern databases can only raise the bound, so check them after the cheap gap test
+                f = max(f, g + 1 + pdb.heuristic(stack))
+                if f > bound:
+                    stack[:move] = stack[move - 1::-1]
+                    minimum = min(minimum, f)
+                    continue
+
+            path.append(move)
+            result = dfs(g + 1, child_gaps, bound)
+            if result is True:
+                return True
+            path.pop()
+            stack[:move] = stack[move - 1::-1]
+            minimum = min(minimum, result)
+
+        return minimum
+
+    # keep searching deeper, raising the bound to the smallest f that was cut off
+    gaps = calc_gaps(stack)
+    bound = gaps if pdb is None else max(gaps, pdb.heuristic(stack))
+    while True:
+        result = dfs(0, gaps, bound)
+        if result is True:
+            if stats is not None:
+                stats['generated'] = generated
+            return path, cnt
+        bound = result
+
+# solving modes that can be selected by name from the command line (headless/batch)
+METHODS = {'gbfs': search, 'optimal': solve, 'bidirectional': bidirectional}
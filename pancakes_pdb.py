@@ -0,0 +1,130 @@
+# pancakes_pdb.py
+# Pattern databases for the pancake problem: precomputed distances for the positions of a few
+# selected pancakes, stored in a compact file that search processes share by memory-mapping it.
+
+import argparse
+import mmap
+import time
+from codec import rank
+
+parser = argparse.ArgumentParser(description="Build pattern databases for stacks of n pancakes by backward BFS from the sorted stack")
+parser.add_argument('-n', '--num', metavar='pancakes', type=int, help="number of pancakes", default=16)
+parser.add_argument('-k', '--size', type=int, help="number of pancakes in each pattern", default=5)
+parser.add_argument('-p', '--patterns', nargs='+', help="pancakes in each pattern, e.g. 0,1,2,3 4,5,6,7 (default: consecutive groups of --size)")
+parser.add_argument('-o', '--output', help="file to write the pattern databases to", default='pancakes.pdb')
+
+MAGIC = b'PANCAKE-PDB\x01'
+UNSEEN = 255  # distance marker for abstract states the BFS has not reached yet
+
+# pattern databases that have already been loaded by this process, so each file is mapped only once
+_loaded = dict() # {file name : PatternDatabase}
+
+def main(args):
+    n = args.num
+    if args.patterns:
+        patterns = [[int(p) for p in pattern.split(',')] for pattern in args.patterns]
+    else:
+        patterns = [list(range(i, min(i + args.size, n))) for i in range(0, n, args.size)]
+
+    tables = []
+    for pattern in patterns:
+        start = time.perf_counter()
+        tables.append(build(n, pattern))
+        print(f'pattern {pattern}: {len(tables[-1])} entries, max distance {max(tables[-1])} ({time.perf_counter() - start:.1f} s)')
+
+    write(args.output, n, patterns, tables)
+    print(f'wrote {args.output}')
+
+def build(n, pattern):
+    '''Compute the number of flips needed to bring the pancakes in a pattern to their sorted positions, from every
+    placement of those pancakes in a stack of n, by breadth-first search backward from the sorted stack.
+    The other pancakes are indistinguishable, so every distance is a lower bound on the real number of flips.
+    Returns a bytearray indexed by the rank of the positions of the pattern pancakes.'''
+    k = len(pattern)
+    size = 1
+    for i in range(k):
+        size *= n - i
+    table = bytearray([UNSEEN]) * size
+
+    # the abstract state is the position of each pattern pancake, and in the sorted stack pancake p is at position p
+    goal = tuple(pattern)
+    table[rank(goal, n)] = 0
+    layer = [goal]
+    distance = 0
+    while layer:
+        distance += 1
+        next_layer = []
+        for positions in layer:
+            for move in range(2, n + 1):
+                # flipping the top pancakes moves the pancake at position i < move to position move - 1 - i
+                child = tuple(move - 1 - i if i < move else i for i in positions)
+                index = rank(child, n)
+                if table[index] == UNSEEN:
+                    table[index] = distance
+                    next_layer.append(child)
+        layer = next_layer
+
+    return table
+
+def write(file_name, n, patterns, tables):
+    '''Write pattern databases to a file: a header with n and the patterns, followed by one byte per entry of each table.'''
+    with open(file_name, 'wb') as file:
+        file.write(MAGIC)
+        file.write(bytes([n, len(patterns)]))
+        for pattern in patterns:
+            file.write(bytes([len(pattern)] + pattern))
+        for table in tables:
+            file.write(table)
+
+def load(file_name):
+    '''Load the pattern databases from a file by memory-mapping it, so that every process using the same file
+    shares one copy in the page cache. Repeated loads of the same file in one process return the same object.'''
+    if file_name not in _loaded:
+        _loaded[file_name] = PatternDatabase(file_name)
+    return _loaded[file_name]
+
+class PatternDatabase:
+    '''Memory-mapped pattern databases for stacks of n pancakes, used as a max-of-patterns admissible heuristic.
+    Pattern distances cannot be added together, since a single flip usually moves pancakes from several patterns.'''
+
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{file_name} is not a pancake pattern database")
+        offset = len(MAGIC)
+        self.n, count = self.data[offset], self.data[offset + 1]
+        offset += 2
+
+        self.patterns = []
+        for _ in range(count):
+            k = self.data[offset]
+            self.patterns.append(tuple(self.data[offset + 1:offset + 1 + k]))
+            offset += 1 + k
+
+        # each table starts where the previous one ended
+        self.offsets = []
+        for pattern in self.patterns:
+            self.offsets.append(offset)
+            size = 1
+            for i in range(len(pattern)):
+                size *= self.n - i
+            offset += size
+
+    def heuristic(self, stack):
+        '''Look up the largest pattern distance for a stack of pancakes.'''
+        if len(stack) != self.n:
+            raise ValueError(f"pattern database is for {self.n} pancakes, not {len(stack)}")
+
+        where = [0] * self.n # position of each pancake in the stack
+        for i, p in enumerate(stack):
+            where[p] = i
+
+        h = 0
+        for pattern, offset in zip(self.patterns, self.offsets):
+            h = max(h, self.data[offset + rank([where[p] for p in pattern], self.n)])
+        return h
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,63 @@
+# rubiks_bench.py
+# Scaling benchmark for the parallel cube solver: solve the same seeded scrambles with more and more worker processes,
+# and report the speedup and parallel efficiency over a single worker.
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from cube_moves import METRICS, parse
+from rubiks_core import hda, is_solved, load_pdb, simulate, solved_state
+
+parser = argparse.ArgumentParser(description="Measure how the parallel A* cube solver scales with the number of worker processes")
+parser.add_argument('-w', '--workers', nargs='+', type=int, help="numbers of worker processes (default: 1, 2, 4, ... up to the number of cores)")
+parser.add_argument('-d', '--depth', type=int, default=10, help="number of random moves in each scramble")
+parser.add_argument('-s', '--seeds', type=int, default=3, help="number of seeded scrambles (seeds 0, 1, ...)")
+parser.add_argument('--pdb', help="pattern database file or directory (see cube_pdb.py) to use as the search heuristic")
+parser.add_argument('--metric', choices=list(METRICS), default='qtm', help="turn metric of the scrambles and the search")
+parser.add_argument('-o', '--output', help="CSV file to save the results to")
+
+FIELDS = ['workers', 'seed', 'length', 'expansions', 'generated', 'time', 'speedup', 'efficiency']
+
+def main(args):
+    workers = args.workers or [w for w in [1, 2, 4, 8, 16, 32, 64] if w <= os.cpu_count()]
+    pdb = load_pdb(args.pdb, args.metric) if args.pdb else None
+
+    results = []
+    for seed in range(args.seeds):
+        state = scramble(args.depth, seed, args.metric)
+        baseline = None
+        for w in workers:
+            params = {'n': 3, 'metric': args.metric, 'workers': w}
+            stats = dict()
+            start = time.perf_counter()
+            path, cnt = hda(state, params, stats=stats, pdb=pdb)
+            elapsed = time.perf_counter() - start
+            assert is_solved(simulate(state, path), params)
+
+            # speedup is measured against the first (smallest) number of workers, counted as perfectly efficient
+            if baseline is None:
+                baseline = elapsed * w
+            result = {'workers': w, 'seed': seed, 'length': len(parse(path)), 'expansions': cnt, 'generated': stats['generated'],
+                      'time': elapsed, 'speedup': baseline / elapsed, 'efficiency': baseline / elapsed / w}
+            results.append(result)
+            print(f"workers={w:<3} seed={seed:<3} length={result['length']:<3} expansions={cnt:<9} "
+                  f"time={elapsed:.3f} s speedup={result['speedup']:.2f} efficiency={result['efficiency']:.0%}")
+            sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        print(f'saved {len(results)} results to {args.output}')
+
+def scramble(depth, seed, metric='qtm'):
+    '''Scramble a solved cube with a seeded sequence of random moves.'''
+    rng = random.Random(seed)
+    return simulate(solved_state(), [rng.choice(METRICS[metric]) for _ in range(depth)])
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,448 @@
+# rubiks_core.py
+# Search algorithms for solving a 3x3 Rubik's cube, with no graphical user interface so
+# that they can be imported quickly in batch jobs, worker processes and servers.
+
+import math
+import os
+from frontier import Frontier
+from cube_moves import INVERSE, METRICS, MOVES, apply, macro, parse, successors
+
+def headless(args):
+    '''Solve the cube from the command line arguments and print the results, without a GUI.'''
+    params = {'n': 3, 'metric': args.metric, 'workers': args.workers, 'symmetry': args.symmetry}
+    state = load_state(args.state, params['n']) if args.state else solved_state(params['n'])
+    stats = dict()
+    pdb = load_pdb(args.pdb, params['metric'], args.symmetry) if args.pdb else None
+    cache = open_cache(args.cache, args.cache_size) if args.cache else None
+    path, cnt = solve(state, params, args.method, stats=stats, pdb=pdb, cache=cache)
+    if stats.get('cached'):
+        print('Solution found in the cache')
+    else:
+        print(f'Paths searched: {cnt - 1} ({", ".join(f"{k}: {v}" for k, v in stats.items())})')
+    print(f'final path: {path}')
+
+def solve(state, params, method='astar', verbose=False, stats=None, pdb=None, cache=None):
+    '''Solve the cube with one of the solving modes in METHODS, and return the solution path and the number of nodes expanded.
+    If a solution cache is given (see open_cache), the state is looked up in it first, and a new solution is stored in it,
+    keyed by the solving mode and the settings that decide its answer (see cache_tag).
+    If a stats dict is given, stats['cached'] tells whether the solution came from the cache.
+    A consistently recolored cube (e.g. from a state file using other colors than params['colors']) is relabeled first.'''
+    metric = params.get('metric', 'qtm')
+    if [state[9 * i + 4] for i in range(6)] != list(range(6)):
+        from cube_symmetry import normalize_colors
+        state = normalize_colors(state)
+    if cache is not None:
+        tag = cache_tag(method, params, pdb)
+        path = cache.get(state, tag, metric)
+        if path is not None:
+            if stats is not None:
+                stats['cached'] = True
+            return path, 0
+
+    path, cnt = METHODS[method](state, params, verbose=verbose, stats=stats, pdb=pdb)
+    if cache is not None:
+        cache.put(state, tag, metric, path)
+        if stats is not None:
+            stats['cached'] = False
+    return path, cnt
+
+def cache_tag(method, params, pdb=None):
+    '''Name a solving mode together with the settings that change the solution it finds, so that the cache never answers
+    with a solution found another way: the heuristic of the A* searches (the sticker heuristic gives no optimality guarantee,
+    pattern databases do), symmetry reduction in A*, and the width of a beam search.'''
+    tag = method
+    if method in HEURISTIC_METHODS:
+        if pdb is None:
+            tag += ' h=stickers'
+        else:
+            tag += ' pdb=' + ','.join(sorted(os.path.abspath(db.file_name) for db in pdb.databases))
+            if pdb.symmetric:
+                tag += ' symmetric'
+    if method == 'astar' and params.get('symmetry'):
+        tag += ' symmetry'
+    if method == 'beam':
+        tag += f" width={params.get('beam_width', 'default')}"
+    return tag
+
+def open_cache(file_name, max_entries=None):
+    '''Open (or create) a persistent solution cache, keeping at most max_entries solutions (see cube_cache.py).'''
+    from cube_cache import MAX_ENTRIES, SolutionCache  # only needed when a cache is used
+    return SolutionCache(file_name, max_entries or MAX_ENTRIES)
+
+def load_pdb(path, metric='qtm', symmetric=False):
+    '''Load (memory-map) the pattern databases in a file or directory built by cube_pdb.py, checking that they
+    count moves in the same turn metric as the search (otherwise the heuristic could overestimate).
+    If symmetric is set, the databases are also looked up in symmetric cubes (see cube_pdb.PatternHeuristic).'''
+    from cube_pdb import load  # only needed when pattern databases are used
+    pdb = load(path, symmetric)
+    for db in pdb.databases:
+        if db.metric != metric:
+            raise ValueError(f"pattern database {db.file_name} was built for the {db.metric} metric, not {metric}")
+    return pdb
+
+def solved_state(n=3):
+    '''Make a solved cube, with each side having a unique color.'''
+    state = []
+    for i in range(6):
+        state += [i] * n ** 2
+    return state
+
+def load_state(file_name, n=3):
+    '''Read the colors of each square of the cube from a text file, encoded as a sequence of integers.
+    Blank lines are skipped and the first line of colors is read. Raises ValueError if it does not describe a cube
+    that can be solved (the wrong number of squares or colors, or cubies that cannot be reached by turning faces).'''
+    state = []
+
+    # pointer to current color in the string of colors corresponding to each square in the cube
+    color_idx = 0 
+
+    # read the colors from the inputted file
+    lines = [line.strip() for line in read_file(file_name) if line.strip()]
+    if not lines:
+        raise ValueError(f"{file_name} does not contain a cube state")
+    colors_list = list(lines[0])
+    if len(colors_list) != 6 * n ** 2 or not lines[0].isdigit():
+        raise ValueError(f"{file_name}: a cube state is {6 * n ** 2} digits, not {lines[0]!r}")
+
+    # iterate through each face of the cube
+    for i in range(6):
+        side = [i] * n ** 2 # create the ith face of the cube
+
+        # recolor the cube by reading the "colors_list" using a pointer
+        for j in range(len(side)):
+            side[j] = colors_list[color_idx]
+            color_idx += 1
+        # append each square in the ith face to the current state 
+        for e in side:
+            state.append(int(e))
+
+    if any(state.count(color) != n ** 2 for color in set(state)) or len(set(state)) != 6:
+        raise ValueError(f"{file_name}: a cube state has 6 colors of {n ** 2} squares each")
+    if n == 3:
+        # check the cubies too, after relabeling a recolored cube (see cube_symmetry.normalize_colors)
+        from cube_cubie import from_stickers, is_valid
+        from cube_symmetry import normalize_colors
+        try:
+            cube = from_stickers(normalize_colors(state))
+        except ValueError as error:
+            raise ValueError(f"{file_name}: not a valid cube ({error})") from None
+        if not is_valid(cube):
+            raise ValueError(f"{file_name}: not a valid cube (a cubie is twisted, flipped or swapped on its own)")
+    return state
+
+def astar(state, params, verbose=False, stats=None, pdb=None):
+    '''Run A* search on the cube based on its current state and return the solution path.
+    If a stats dict is given, the number of nodes generated and the peak size of the frontier are stored in it.
+    If pattern databases are given (see cube_pdb.py), they replace the sticker heuristic, making the path optimal.
+    If params['symmetry'] is set, every state is replaced by the representative of its symmetry class (see cube_symmetry.py),
+    so that the closed set holds up to 48 times fewer states.'''
+    print('Running A* search...')
+    h = heuristic if pdb is None else pdb.heuristic
+    metric = params.get('metric', 'qtm')
+    symmetric = params.get('symmetry', False)
+    # ***ENTER CODE HERE*** (20-25 lines)
+    cnt = 0
+    
+    if symmetric:
+        from cube_symmetry import canonical, follow
+        initial_state, turn = canonical(state)
+    else:
+        initial_state, turn = tuple(state), 0
+
+    # nodes here are cube states (as tuples), prioritized by cost g + h, breaking ties in favour of deeper nodes (lower h)
+    queue = Frontier()
+    queue.push(initial_state, (h(initial_state), 0))
+    final_path = ""
+    generated = 0
+    frontier_peak = 1
+
+    # look up table of the fewest moves g(state) found so far to reach each cube state, keyed by the state itself,
+    # so that repeated states (e.g. after "ud" and "du") are detected with an O(1) check instead of a scan.
+    # It doubles as the backpointers, so the path only has to be built once the cube is solved
+    visited = {initial_state: (None, None, 0)} # {state : (parent state, move, g(state))}
+
+    # with symmetry reduction, the symmetry that turned each child into the representative stored in visited
+    turns = dict() # {state : symmetry}
+
+
+    while True:
+
+        # pop the current node off the queue
+        curr_state, (curr_cost, neg_g) = queue.pop()
+        g = -neg_g
+
+        # skip nodes whose state has since been reached with fewer moves (lazy deletion from the queue)
+        if g > visited[curr_state][2]:
+            continue
+
+        cnt += 1
+
+        # check if this state is the solution
+        if is_solved(list(curr_state), params):
+            # we are backward chaining, so collect the moves from the solved state back to the start, and reverse them
+            moves = []
+            while curr_state != initial_state:
+                moves.append((visited[curr_state][1], turns.get(curr_state, 0)))
+                curr_state = visited[curr_state][0]
+            moves.reverse()
+            # the moves of a reduced search turn representatives, so they are turned back into moves of the start state
+            final_path = follow(moves, turn) if symmetric else "".join(move for move, _ in moves)
+            break
+        
+        # generate the children for the given state of the game, each by a single rotation of the current state,
+        # skipping moves that would only repeat a shorter or equivalent sequence (see cube_moves.successors).
+        # A representative's last move was made in another frame, so with symmetry reduction all moves are tried
+        parent_state, last, _ = visited[curr_state]
+        before_last = visited[parent_state][1] if parent_state is not None else None
+        for move in successors(last, before_last, metric) if not symmetric else METRICS[metric]:
+            child_state = apply_move(curr_state, move)
+            generated += 1
+            if symmetric:
+                child_state, k = canonical(child_state)
+
+            # only keep the child if we have never seen its state, or just found a shorter way to it
+            # (in which case the state is reopened, even if it was already expanded)
+            if child_state not in visited or g + 1 < visited[child_state][2]:
+                visited[child_state] = (curr_state, move, g + 1)
+                if symmetric:
+                    turns[child_state] = k
+                queue.push(child_state, (g + 1 + h(child_state), -(g + 1)))
+
+        frontier_peak = max(frontier_peak, len(queue))
+
+
+    if stats is not None:
+        stats['generated'] = generated
+        stats['frontier_peak'] = frontier_peak
+    return final_path, cnt
+
+def idastar(state, params, verbose=False, stats=None, pdb=None):
+    '''Run IDA* search on the cube based on its current state and return the solution path.
+    There is no open list: a single cube is turned in place going down the search tree and turned back on the way up,
+    so memory only grows with the depth of the search. If a stats dict is given, the number of nodes generated is stored in it.
+    If pattern databases are given (see cube_pdb.py), they replace the sticker heuristic, making the path optimal.'''
+    print('Running IDA* search...')
+    h = heuristic if pdb is None else pdb.heuristic
+    metric = params.get('metric', 'qtm')
+    cnt = 0
+    generated = 0
+
+    cube = list(state)
+    solved = solved_state(params['n'])
+    path = [] # moves from the initial state to the current cube
+
+    def dfs(g, bound):
+        '''Depth-first search below the current cube, returning True when solved, or else the smallest cost that exceeded the bound.'''
+        nonlocal cnt, generated
+        f = g + h(cube)
+        if f > bound:
+            return f
+
+        cnt += 1
+        if cube == solved:
+            return True
+
+        minimum = math.inf
+        for move in successors(path[-1] if path else None, path[-2] if len(path) > 1 else None, metric):
+            generated += 1
+            cube[:] = apply(cube, MOVES[move])
+            path.append(move)
+
+            result = dfs(g + 1, bound)
+            if result is True:
+                return True
+
+            # undo the move by turning the face back the other way
+            path.pop()
+            cube[:] = apply(cube, MOVES[INVERSE[move]])
+            minimum = min(minimum, result)
+
+        return minimum
+
+    # keep searching deeper, raising the bound to the smallest cost that was cut off
+    bound = h(cube)
+    while True:
+        if verbose:
+            print(f'  searching with bound {bound:.2f}')
+        result = dfs(0, bound)
+        if result is True:
+            break
+        bound = result
+
+    if stats is not None:
+        stats['generated'] = generated
+    return "".join(path), cnt
+
+def bidirectional(state, params, verbose=False, stats=None, pdb=None):
+    '''Run bidirectional breadth-first search from both the cube and the solved cube, and return a shortest solution path
+    and the number of nodes expanded. Every move is undone by turning the face back the other way, so the backward
+    search turns faces too, and the two searches meet in the middle after about half the depth each (roughly 2 * 12^(d/2)
+    states for a depth d scramble, instead of 12^d). If a stats dict is given, the number of nodes generated and the peak
+    size of the two frontiers are stored in it. Pattern databases are not used (this is a blind search).'''
+    print('Running bidirectional search...')
+    metric = params.get('metric', 'qtm')
+    start = tuple(state)
+    goal = tuple(solved_state(params['n']))
+    cnt = 0
+    generated = 0
+    frontier_peak = 1
+    if start == goal:
+        if stats is not None:
+            stats['generated'] = generated
+            stats['frontier_peak'] = frontier_peak
+        return "", cnt
+
+    # one visited table per direction, doubling as the backpointers
+    forward = {start: (None, None)} # {state : (parent state, move)}
+    backward = {goal: (None, None)}
+    forward_layer = [start]
+    backward_layer = [goal]
+    depth = 0
+
+    while True:
+        # always grow the side with the smaller frontier
+        if len(forward_layer) <= len(backward_layer):
+            visited, other, layer = forward, backward, forward_layer
+        else:
+            visited, other, layer = backward, forward, backward_layer
+        depth += 1
+        if verbose:
+            print(f'  depth {depth}: expanding {len(layer)} {"forward" if visited is forward else "backward"} states')
+
+        next_layer = []
+        for curr_state in layer:
+            cnt += 1
+            parent_state, last = visited[curr_state]
+            before_last = visited[parent_state][1] if parent_state is not None else None
+            for move in successors(last, before_last, metric):
+                generated += 1
+                child_state = apply_move(curr_state, move)
+                if child_state in visited:
+                    continue
+                visited[child_state] = (curr_state, move)
+
+                # every state within the other search's radius is already in its table, so the first
+                # state both searches have reached lies on a shortest path
+                if child_state in other:
+                    if stats is not None:
+                        stats['generated'] = generated
+                        stats['frontier_peak'] = frontier_peak
+                    return join_paths(forward, backward, child_state), cnt
+                next_layer.append(child_state)
+
+        if visited is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+        frontier_peak = max(frontier_peak, len(forward_layer) + len(backward_layer))
+
+def join_paths(forward, backward, meet):
+    '''Join the paths from the forward and backward searches at the state where they met.'''
+    # walk back to the starting state, and reverse
+    moves = []
+    curr_state = meet
+    while forward[curr_state][0] is not None:
+        curr_state, move = forward[curr_state]
+        moves.append(move)
+    moves.reverse()
+
+    # walk on to the solved state, undoing each backward move by turning the face the other way
+    curr_state = meet
+    while backward[curr_state][0] is not None:
+        curr_state, move = backward[curr_state]
+        moves.append(INVERSE[move])
+    return "".join(moves)
+
+def batch_bfs(state, params, verbose=False, stats=None, pdb=None):
+    '''Run breadth-first search on the cube a whole layer at a time with NumPy (see cube_batch.py), and return a shortest solution path.
+    If a stats dict is given, the number of nodes generated and the peak size of a layer are stored in it. Pattern databases are not used.'''
+    print('Running batched breadth-first search...')
+    from cube_batch import search  # NumPy is only needed for the batched solving modes
+    return search(state, params, verbose=verbose, stats=stats)
+
+def beam(state, params, verbose=False, stats=None, pdb=None):
+    '''Run beam search on the cube with NumPy (see cube_batch.py), keeping the params['beam_width'] most promising cubes in each layer,
+    and return a solution path (not necessarily the shortest). If a stats dict is given, the number of nodes generated and
+    the peak size of a layer are stored in it. Pattern databases are not used.'''
+    print('Running beam search...')
+    from cube_batch import BEAM_WIDTH, search  # NumPy is only needed for the batched solving modes
+    return search(state, params, params.get('beam_width', BEAM_WIDTH), verbose=verbose, stats=stats)
+
+def hda(state, params, verbose=False, stats=None, pdb=None):
+    '''Run hash-distributed A* on the cube across params['workers'] worker processes (see cube_hda.py), and return the solution path.
+    If a stats dict is given, the number of nodes generated and the nodes expanded by each worker are stored in it.
+    If pattern databases are given (see cube_pdb.py), they replace the sticker heuristic, making the path optimal.'''
+    print('Running parallel A* search...')
+    from cube_hda import hda  # the worker processes are only needed for this solving mode
+    return hda(state, params, verbose=verbose, stats=stats, pdb=pdb)
+
+def twophase(state, params, verbose=False, stats=None, pdb=None):
+    '''Solve the cube with Kociemba's two-phase algorithm (see cube_twophase.py), and return a solution path of at most 24 moves,
+    not necessarily the shortest. Half turns (e.g. U2) are used whatever the metric. If a stats dict is given, the number of
+    nodes expanded in each phase is stored in it. Pattern databases are not used (the two phases have their own tables).'''
+    print('Running two-phase search...')
+    from cube_twophase import solve  # the tables are only loaded (or built) when this solving mode is used
+    return solve(state, params, verbose=verbose, stats=stats)
+
+def cost(node, state):
+    '''Compute the cost g(node)+h(node) for a given set of moves (node) leading to a cube state.
+    Let g(node) be the number of moves it took to get to the state.
+    Let h(node) be the average number of incorrect square colors on the cube. For h(node)=0, all colors will match the center color of that face, which never moves.
+    '''
+    # ***MODIFY CODE HERE*** (1 line)
+    g = len(parse(node))
+    return g + heuristic(state)
+
+def heuristic(state):
+    '''Compute h(state), the average number of incorrect square colors on each face of the cube.'''
+    h = 0
+
+    for i in range(6):
+        center_color = state[(i * 9) + 4]
+        for j in range(9):
+            if state[(i * 9) + j] != center_color:
+                h += 1
+
+    h /= 6
+
+    return h
+
+def rotate(state, face, direction='CW'):
+    '''Rotate the cube face (U/D/L/R/B/F) in a given direction (CW/CCW), or a half turn (180).'''
+    move = {'CW': face.lower(), 'CCW': face.upper(), '180': face.upper() + '2'}[direction]
+    state[:] = apply(state, MOVES[move])
+
+def simulate(state, node):
+    '''Simulate rotating the cube from an input state to determine resulting state. 
+    The input node is a sequence of rotations (e.g. "uR2f").'''
+    # ***ENTER CODE HERE***  (4 lines)
+    # the whole sequence of rotations is composed into one permutation, and applied to a copy of the state
+    # so that we don't change the actual cube!
+    return list(apply(state, macro(node)))
+
+def apply_move(state, move):
+    '''Apply a single move (lowercase for CW, uppercase for CCW, e.g. U2 for a half turn) to a cube state given as a tuple, returning a new tuple.'''
+    return apply(state, MOVES[move])
+
+def is_solved(state, params):
+    '''Takes a cube state as a 1D list, and determines if the cube is solved'''
+    
+    # create a solved cube
+    solved = []
+    for i in range(6):
+        solved += [i] * params['n'] ** 2
+    
+    # check the solved state with the given state
+    return state == solved
+
+def read_file(file_name):
+    ''''''
+    with open(file_name, 'r') as file:
+        return file.readlines()
+
+# solving modes that search with a heuristic, either the sticker heuristic or pattern databases
+HEURISTIC_METHODS = {'astar', 'idastar', 'hda'}
+
+# solving modes that can be selected by name from the command line
+METHODS = {'astar': astar, 'idastar': idastar, 'bidirectional': bidirectional,
+           'batch-bfs': batch_bfs, 'beam': beam, 'hda': hda, 'twophase': twophase}